@@ -0,0 +1,81 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class AsyncJobRunner:
+    def __init__(self, root, interval=15, max_workers=None, use_processes=True, on_progress=None):
+        self.root = root
+        self.interval = interval
+        self.on_progress = on_progress
+        self.loop = asyncio.new_event_loop()
+        if use_processes:
+            self.executor = ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.tasks = {}
+        self.submitted = 0
+        self.completed = 0
+        self.tick_id = self.root.after(self.interval, self.tick)
+
+    def tick(self):
+        # Drain whatever the asyncio loop has ready, then hand control back to Tk.
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self.tick_id = self.root.after(self.interval, self.tick)
+
+    def submit(self, group, func, *args, on_done=None, on_error=None):
+        task = self.loop.create_task(self.run_job(func, args, on_done, on_error))
+        self.tasks.setdefault(group, set()).add(task)
+        task.add_done_callback(lambda t: self.job_finished(group, t))
+        self.submitted += 1
+        self.report_progress()
+        return task
+
+    async def run_job(self, func, args, on_done, on_error):
+        try:
+            result = await self.loop.run_in_executor(self.executor, func, *args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            return
+        if on_done:
+            on_done(result)
+
+    def job_finished(self, group, task):
+        tasks = self.tasks.get(group)
+        if tasks is not None:
+            tasks.discard(task)
+            if not tasks:
+                del self.tasks[group]
+        self.completed += 1
+        self.report_progress()
+
+    def cancel(self, group=None):
+        # Jobs that have not started yet are dropped from the pool; jobs already
+        # running finish in the background but their callbacks never fire.
+        groups = list(self.tasks) if group is None else [group]
+        for name in groups:
+            for task in list(self.tasks.get(name, ())):
+                task.cancel()
+
+    def is_busy(self, group=None):
+        if group is None:
+            return bool(self.tasks)
+        return bool(self.tasks.get(group))
+
+    def report_progress(self):
+        if self.completed >= self.submitted:
+            self.submitted = 0
+            self.completed = 0
+        if self.on_progress:
+            self.on_progress(self.completed, self.submitted)
+
+    def shutdown(self):
+        self.root.after_cancel(self.tick_id)
+        self.cancel()
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.loop.close()
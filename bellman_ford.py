@@ -1,15 +1,33 @@
 import networkx as nx
+import numpy as np
 
-def bellman_ford(graph, source):
-    distances = {node: float('infinity') for node in graph.nodes()}
-    predecessors = {node: None for node in graph.nodes()}
-    distances[source] = 0
+def bellman_ford(graph, source, warm_start=None, stats=None):
+    # warm_start takes the (distances, predecessors) of an earlier run on the
+    # same source; only the changes since then need to be relaxed away.
+    if warm_start is None:
+        distances = {node: float('infinity') for node in graph.nodes()}
+        predecessors = {node: None for node in graph.nodes()}
+        distances[source] = 0
+    else:
+        distances, predecessors = tree_distances(graph, source, warm_start[1])
     
+    passes = 0
+    relaxations = 0
     for _ in range(len(graph.nodes()) - 1):
+        updated = False
+        passes += 1
         for u, v, weight in graph.edges(data='weight', default=1):
             if distances[u] + weight < distances[v]:
                 distances[v] = distances[u] + weight
                 predecessors[v] = u
+                updated = True
+                relaxations += 1
+        if not updated:
+            break
+    
+    if stats is not None:
+        stats['passes'] = passes
+        stats['relaxations'] = relaxations
     
     for u, v, weight in graph.edges(data='weight', default=1):
         if distances[u] + weight < distances[v]:
@@ -17,6 +35,31 @@ def bellman_ford(graph, source):
             
     return distances, predecessors
 
+def tree_distances(graph, source, previous_predecessors):
+    # Re-measure the previous shortest-path tree under the current weights.
+    # These are lengths of real paths, so they are safe upper bounds to start
+    # relaxing from even when some link costs went up; subtrees hanging off a
+    # link that no longer exists start again from infinity.
+    distances = {node: float('infinity') for node in graph.nodes()}
+    predecessors = {node: None for node in graph.nodes()}
+    distances[source] = 0
+    
+    children = {}
+    for node, parent in previous_predecessors.items():
+        if parent is not None and node in distances:
+            children.setdefault(parent, []).append(node)
+    
+    stack = [source]
+    while stack:
+        u = stack.pop()
+        for v in children.get(u, ()):
+            if v != source and graph.has_edge(u, v):
+                distances[v] = distances[u] + graph[u][v].get('weight', 1)
+                predecessors[v] = u
+                stack.append(v)
+    
+    return distances, predecessors
+
 def get_shortest_path(predecessors, source, target):
     path = []
     current = target
@@ -27,3 +70,92 @@ def get_shortest_path(predecessors, source, target):
     
     path.reverse()
     return path if path[0] == source else [] 
+
+def shortest_path(graph, source, target):
+    distances, predecessors = bellman_ford(graph, source)
+    if distances[target] == float('infinity'):
+        return [], None
+    return get_shortest_path(predecessors, source, target), distances[target]
+
+def routing_tables(graph, destinations=None):
+    # Running from each destination on the reversed graph means the
+    # predecessor of a node is its next hop towards that destination.
+    if destinations is None:
+        destinations = graph.nodes()
+    reverse = graph.reverse(copy=False) if graph.is_directed() else graph
+    
+    tables = {}
+    for destination in destinations:
+        _, predecessors = bellman_ford(reverse, destination)
+        tables[destination] = predecessors
+    return tables
+
+def predecessor_array(predecessors, count=None):
+    # Nodes are device indices, so the dict maps onto a dense int array
+    # with -1 standing in for "no predecessor".
+    if count is None:
+        count = max(predecessors, default=-1) + 1
+    pred = np.full(count, -1, dtype=np.int64)
+    for node, parent in predecessors.items():
+        if parent is not None:
+            pred[node] = parent
+    return pred
+
+def hop_counts(pred, source):
+    # Pointer jumping: every pass doubles how far each node has looked up the tree.
+    count = len(pred)
+    has_parent = pred >= 0
+    jump = np.where(has_parent, pred, np.arange(count))
+    depth = has_parent.astype(np.int64)
+    
+    while True:
+        next_jump = jump[jump]
+        if np.array_equal(next_jump, jump):
+            break
+        depth += depth[jump]
+        jump = next_jump
+    
+    return np.where(jump == source, depth, -1)
+
+def ancestors(pred, nodes, steps):
+    # Binary lifting: walks each node `steps` hops up the predecessor tree.
+    nodes = np.array(nodes, dtype=np.int64)
+    steps = np.asarray(steps, dtype=np.int64)
+    up = np.where(pred >= 0, pred, np.arange(len(pred)))
+    
+    bit = 0
+    while np.any(steps >> bit):
+        mask = ((steps >> bit) & 1).astype(bool)
+        nodes[mask] = up[nodes[mask]]
+        up = up[up]
+        bit += 1
+    return nodes
+
+def first_hop_array(pred, source, depth=None):
+    if depth is None:
+        depth = hop_counts(pred, source)
+    hops = np.full(len(pred), -1, dtype=np.int64)
+    reachable = np.flatnonzero(depth > 0)
+    hops[reachable] = ancestors(pred, reachable, depth[reachable] - 1)
+    hops[source] = source
+    return hops
+
+def batch_paths(pred, source, depth=None):
+    # All paths from the source packed into one array: the path to node v
+    # is flat[offsets[v]:offsets[v + 1]], empty when v is unreachable.
+    if depth is None:
+        depth = hop_counts(pred, source)
+    lengths = np.where(depth >= 0, depth + 1, 0)
+    offsets = np.zeros(len(pred) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    flat = np.empty(offsets[-1], dtype=np.int64)
+    
+    current = np.flatnonzero(depth >= 0)
+    position = offsets[current] + depth[current]
+    while len(current):
+        flat[position] = current
+        keep = current != source
+        current = pred[current[keep]]
+        position = position[keep] - 1
+    
+    return flat, offsets
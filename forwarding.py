@@ -0,0 +1,211 @@
+import math
+
+import numpy as np
+import networkx as nx
+
+from bellman_ford import bellman_ford, predecessor_array, first_hop_array
+
+BASE_ADDRESS = 10 << 24       # 10.0.0.0/8 is carved up between devices
+BASE_LENGTH = 8
+NO_ROUTE = -1
+
+
+def format_address(address, length=None):
+    address = int(address)
+    text = '.'.join(str((address >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+    return f"{text}/{length}" if length is not None else text
+
+
+def parse_address(text):
+    parts = [int(part) for part in text.split('.')]
+    if len(parts) != 4 or any(part < 0 or part > 255 for part in parts):
+        raise ValueError(f"Invalid IPv4 address: {text}")
+    return (parts[0] << 24) | (parts[1] << 16) | (parts[2] << 8) | parts[3]
+
+
+class AddressPlan:
+    def __init__(self, networks, length):
+        self.networks = networks
+        self.length = length
+
+    def prefix(self, device_id):
+        return int(self.networks[device_id]), self.length
+
+    def host(self, device_id, offset=1):
+        return int(self.networks[device_id]) + offset
+
+
+def assign_prefixes(graph):
+    # Devices are numbered in DFS order from the first node so that
+    # neighbours get adjacent blocks, which lets tables aggregate well.
+    count = graph.number_of_nodes()
+    bits = max(math.ceil(math.log2(max(count, 2))), 1)
+    length = BASE_LENGTH + bits
+    if length > 32:
+        raise ValueError(f"Cannot address {count} devices inside 10.0.0.0/8")
+
+    order = []
+    seen = set()
+    for start in sorted(graph.nodes()):
+        if start not in seen:
+            component = list(nx.dfs_preorder_nodes(graph, start))
+            seen.update(component)
+            order.extend(component)
+
+    networks = np.zeros(max(order, default=-1) + 1, dtype=np.int64)
+    block = 1 << (32 - length)
+    networks[np.array(order, dtype=np.int64)] = BASE_ADDRESS + np.arange(len(order), dtype=np.int64) * block
+    return AddressPlan(networks, length)
+
+
+def first_hops(graph, router):
+    _, predecessors = bellman_ford(graph, router)
+    return first_hop_array(predecessor_array(predecessors), router)
+
+
+def aggregate(networks, lengths, next_hops):
+    # Merge sibling prefixes that share a next hop into their parent, longest first.
+    networks = np.asarray(networks, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    next_hops = np.asarray(next_hops, dtype=np.int64)
+
+    for length in range(int(lengths.max(initial=0)), BASE_LENGTH, -1):
+        at_length = lengths == length
+        if at_length.sum() < 2:
+            continue
+
+        index = np.flatnonzero(at_length)
+        parent = networks[index] >> (33 - length)
+        order = np.lexsort((next_hops[index], parent))
+        index = index[order]
+        parent = parent[order]
+
+        pair = (parent[1:] == parent[:-1]) & (next_hops[index[1:]] == next_hops[index[:-1]])
+        first = np.flatnonzero(pair)
+        if not len(first):
+            continue
+        # Adjacent pairs can overlap (a, b), (b, c) only if three prefixes share
+        # a parent, which cannot happen for distinct prefixes of equal length.
+        keep = np.ones(len(networks), dtype=bool)
+        keep[index[first + 1]] = False
+        merged = index[first]
+        networks[merged] = parent[first] << (33 - length)
+        lengths[merged] = length - 1
+
+        networks, lengths, next_hops = networks[keep], lengths[keep], next_hops[keep]
+
+    return networks, lengths, next_hops
+
+
+def compile_intervals(networks, lengths, next_hops):
+    # Nested prefixes become a sorted array of disjoint [start, next start) ranges.
+    ends = networks + (np.int64(1) << (32 - lengths))
+    order = np.lexsort((lengths, networks))
+
+    starts = [0]
+    hops = [NO_ROUTE]
+
+    def emit(position, hop):
+        if starts[-1] == position:
+            hops[-1] = hop
+        elif hops[-1] != hop:
+            starts.append(position)
+            hops.append(hop)
+
+    stack = []
+    for i in order.tolist():
+        start = int(networks[i])
+        while stack and stack[-1][0] <= start:
+            end, _ = stack.pop()
+            emit(end, stack[-1][1] if stack else NO_ROUTE)
+        emit(start, int(next_hops[i]))
+        stack.append((int(ends[i]), int(next_hops[i])))
+    while stack:
+        end, _ = stack.pop()
+        emit(end, stack[-1][1] if stack else NO_ROUTE)
+
+    return np.array(starts, dtype=np.int64), np.array(hops, dtype=np.int64)
+
+
+class ForwardingTable:
+    def __init__(self, router, networks, lengths, next_hops):
+        self.router = router
+        self.networks = networks
+        self.lengths = lengths
+        self.next_hops = next_hops
+        self.starts, self.hops = compile_intervals(networks, lengths, next_hops)
+
+    def __len__(self):
+        return len(self.networks)
+
+    def lookup(self, addresses):
+        addresses = np.asarray(addresses, dtype=np.int64)
+        return self.hops[np.searchsorted(self.starts, addresses, side='right') - 1]
+
+    def lookup_one(self, address):
+        return int(self.lookup([address])[0])
+
+    def routes(self):
+        return [
+            (format_address(network, length), int(hop))
+            for network, length, hop in zip(self.networks, self.lengths, self.next_hops)
+        ]
+
+
+def compile_forwarding_table(graph, router, plan):
+    hops = first_hops(graph, router)
+    destinations = np.flatnonzero(hops != NO_ROUTE)
+    next_hops = hops[destinations]
+    networks = plan.networks[destinations]
+    lengths = np.full(len(destinations), plan.length, dtype=np.int64)
+    return ForwardingTable(router, *aggregate(networks, lengths, next_hops))
+
+
+def compile_forwarding_tables(graph, routers, plan=None):
+    if plan is None:
+        plan = assign_prefixes(graph)
+    tables = {router: compile_forwarding_table(graph, router, plan) for router in routers}
+    return plan, tables
+
+
+def export_forwarding_tables(file_path, plan, tables):
+    routers = sorted(tables)
+    offsets = np.zeros(len(routers) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(tables[router]) for router in routers])
+
+    def stacked(field, dtype):
+        if not routers:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate([getattr(tables[router], field) for router in routers]).astype(dtype)
+
+    np.savez_compressed(
+        file_path,
+        address_networks=plan.networks.astype(np.uint32),
+        address_length=np.array([plan.length], dtype=np.uint8),
+        routers=np.array(routers, dtype=np.int32),
+        offsets=offsets,
+        networks=stacked('networks', np.uint32),
+        lengths=stacked('lengths', np.uint8),
+        next_hops=stacked('next_hops', np.int32)
+    )
+
+
+def load_forwarding_tables(file_path):
+    with np.load(file_path) as data:
+        plan = AddressPlan(data['address_networks'].astype(np.int64), int(data['address_length'][0]))
+        offsets = data['offsets']
+        networks = data['networks'].astype(np.int64)
+        lengths = data['lengths'].astype(np.int64)
+        next_hops = data['next_hops'].astype(np.int64)
+
+        tables = {}
+        for i, router in enumerate(data['routers'].tolist()):
+            start, end = offsets[i], offsets[i + 1]
+            tables[router] = ForwardingTable(router, networks[start:end], lengths[start:end], next_hops[start:end])
+    return plan, tables
+
+
+def build_and_export(file_path, graph, routers):
+    plan, tables = compile_forwarding_tables(graph, routers)
+    export_forwarding_tables(file_path, plan, tables)
+    return len(tables), sum(len(table) for table in tables.values())
@@ -0,0 +1,233 @@
+import math
+
+import numpy as np
+
+from network_devices import DeviceType
+
+TIER_ORDER = [DeviceType.ROUTER, DeviceType.SWITCH, DeviceType.PC]
+
+
+def edge_array(edges):
+    return np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+
+
+def hierarchical_layout(node_types, edges, spacing=60, max_columns=None):
+    count = len(node_types)
+    edges = edge_array(edges)
+    positions = np.zeros((count, 2))
+    if not count:
+        return positions
+
+    tiers = np.fromiter((TIER_ORDER.index(t) for t in node_types), dtype=np.int8, count=count)
+    if max_columns is None:
+        max_columns = max(int(math.sqrt(count) * 2), 20)
+
+    # Each tier is ordered by the barycenter of its neighbours in the tier
+    # above, so children end up under their parents.
+    rank = np.full(count, np.inf)
+    y = spacing
+    for tier in range(len(TIER_ORDER)):
+        members = np.flatnonzero(tiers == tier)
+        if not len(members):
+            continue
+
+        if tier == 0:
+            order = members
+        else:
+            parent_rank = np.zeros(count)
+            parent_count = np.zeros(count)
+            for a, b in ((edges[:, 0], edges[:, 1]), (edges[:, 1], edges[:, 0])):
+                mask = (tiers[a] == tier) & (tiers[b] < tier)
+                parent_rank += np.bincount(a[mask], weights=rank[b[mask]], minlength=count)
+                parent_count += np.bincount(a[mask], minlength=count)
+            barycenter = np.divide(parent_rank, parent_count, out=np.full(count, np.inf), where=parent_count > 0)
+            order = members[np.argsort(barycenter[members], kind='stable')]
+
+        columns = min(len(order), max_columns)
+        slot = np.arange(len(order))
+        row_offset = (max_columns - columns) * spacing / 2
+        positions[order, 0] = (slot % columns) * spacing + spacing + row_offset
+        positions[order, 1] = (slot // columns) * spacing + y
+
+        # Ranks are scaled to the router row width so barycenters stay comparable.
+        rank[order] = slot * (max_columns / max(columns, 1))
+        y += (len(order) // columns + 1) * spacing + spacing * 2
+
+    return positions
+
+
+NEAR_OFFSETS = ((0, 0), (0, 1), (1, -1), (1, 0), (1, 1))
+
+
+def repulsion_field(positions, k, grid_size):
+    # P3M approximation of the k^2 / d repulsion: node counts are binned on a
+    # grid and convolved with the force kernel via FFT for distant cells, and
+    # pairs in the same or adjacent cells are summed exactly.
+    low = positions.min(axis=0)
+    high = positions.max(axis=0)
+    cell = max((high - low).max() / (grid_size - 1), 1e-9)
+    cells = np.minimum(((positions - low) / cell).astype(np.int64), grid_size - 1)
+
+    flat = cells[:, 0] * grid_size + cells[:, 1]
+    density = np.bincount(flat, minlength=grid_size * grid_size).reshape(grid_size, grid_size).astype(float)
+
+    size = 2 * grid_size
+    steps = np.fft.fftfreq(size, 1.0 / size)
+    dx, dy = np.meshgrid(steps * cell, steps * cell, indexing='ij')
+    distance_sq = dx * dx + dy * dy
+    near = np.abs(steps)[:, None] <= 1
+    near = near & near.T
+    distance_sq[near] = np.inf
+    kernel_x = k * k * dx / distance_sq
+    kernel_y = k * k * dy / distance_sq
+
+    density_fft = np.fft.rfft2(density, s=(size, size))
+    field_x = np.fft.irfft2(density_fft * np.fft.rfft2(kernel_x), s=(size, size))[:grid_size, :grid_size]
+    field_y = np.fft.irfft2(density_fft * np.fft.rfft2(kernel_y), s=(size, size))[:grid_size, :grid_size]
+
+    field = np.column_stack([field_x.ravel()[flat], field_y.ravel()[flat]])
+    field += near_field(positions, cells, flat, k, grid_size)
+    return field
+
+
+def near_field(positions, cells, flat, k, grid_size):
+    # Nodes are processed in cell order so each cell's members are one contiguous run.
+    count = len(positions)
+    order = np.argsort(flat, kind='stable')
+    x = positions[order, 0]
+    y = positions[order, 1]
+    ci = cells[order, 0]
+    cj = cells[order, 1]
+    occupied, starts, sizes = np.unique(flat[order], return_index=True, return_counts=True)
+
+    field_x = np.zeros(count)
+    field_y = np.zeros(count)
+    # Each unordered pair of cells is visited once through half the neighbourhood.
+    for di, dj in NEAR_OFFSETS:
+        ni = ci + di
+        nj = cj + dj
+        target = ni * grid_size + nj
+        slot = np.minimum(np.searchsorted(occupied, target), len(occupied) - 1)
+        valid = (ni < grid_size) & (nj >= 0) & (nj < grid_size) & (occupied[slot] == target)
+
+        u = np.flatnonzero(valid)
+        first = starts[slot[u]]
+        counts = sizes[slot[u]]
+        if di == 0 and dj == 0:
+            counts = first + counts - u - 1
+            first = u + 1
+        total = counts.sum()
+        if not total:
+            continue
+
+        u = np.repeat(u, counts)
+        v = np.arange(total) + np.repeat(first - (np.cumsum(counts) - counts), counts)
+        dx = x[u] - x[v]
+        dy = y[u] - y[v]
+        distance_sq = dx * dx + dy * dy
+        # Coincident nodes get a fixed but pair-specific direction to separate along.
+        stacked = distance_sq < 1e-12
+        if stacked.any():
+            angle = (order[u[stacked]] * 7919 + order[v[stacked]]) % 360 * (np.pi / 180)
+            dx[stacked] = np.cos(angle) * 1e-3
+            dy[stacked] = np.sin(angle) * 1e-3
+            distance_sq[stacked] = 1e-6
+
+        scale = k * k / distance_sq
+        dx *= scale
+        dy *= scale
+        field_x += np.bincount(u, weights=dx, minlength=count) - np.bincount(v, weights=dx, minlength=count)
+        field_y += np.bincount(u, weights=dy, minlength=count) - np.bincount(v, weights=dy, minlength=count)
+
+    field = np.empty((count, 2))
+    field[order, 0] = field_x
+    field[order, 1] = field_y
+    return field
+
+
+def force_directed_layout(count, edges, positions=None, fixed=None, iterations=50,
+                          area=None, grid_size=None, temperature=None, seed=None):
+    edges = edge_array(edges)
+    rng = np.random.default_rng(seed)
+    if area is None:
+        area = max(count, 1) * 60.0 ** 2
+    k = math.sqrt(area / max(count, 1))
+    side = math.sqrt(area)
+
+    if positions is None:
+        positions = rng.uniform(0, side, size=(count, 2))
+    else:
+        positions = np.array(positions, dtype=float)
+    if count < 2:
+        return positions
+
+    if grid_size is None:
+        grid_size = int(min(max(math.sqrt(count), 32), 256))
+    if temperature is None:
+        temperature = side / 10
+    movable = np.ones(count, dtype=bool) if fixed is None else ~np.asarray(fixed, dtype=bool)
+
+    u, v = edges[:, 0], edges[:, 1]
+    for step in range(iterations):
+        displacement = repulsion_field(positions, k, grid_size)
+
+        delta = positions[v] - positions[u]
+        distance = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1e-9)
+        pull = delta * (distance / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] += np.bincount(u, weights=pull[:, axis], minlength=count)
+            displacement[:, axis] -= np.bincount(v, weights=pull[:, axis], minlength=count)
+
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 1e-9)
+        limit = temperature * (1 - step / iterations)
+        move = displacement * (np.minimum(length, limit) / length)[:, None]
+        positions[movable] += move[movable]
+
+    return positions
+
+
+def place_new_nodes(positions, known, edges, seed=None, spread=30.0):
+    # New nodes start at the centroid of their already-placed neighbours.
+    positions = np.array(positions, dtype=float)
+    known = np.asarray(known, dtype=bool)
+    edges = edge_array(edges)
+    rng = np.random.default_rng(seed)
+    count = len(positions)
+
+    sums = np.zeros((count, 2))
+    counts = np.zeros(count)
+    for a, b in ((edges[:, 0], edges[:, 1]), (edges[:, 1], edges[:, 0])):
+        mask = ~known[a] & known[b]
+        for axis in range(2):
+            sums[:, axis] += np.bincount(a[mask], weights=positions[b[mask], axis], minlength=count)
+        counts += np.bincount(a[mask], minlength=count)
+
+    new = np.flatnonzero(~known)
+    anchored = new[counts[new] > 0]
+    floating = new[counts[new] == 0]
+    positions[anchored] = sums[anchored] / counts[anchored, None]
+    positions[anchored] += rng.normal(0, spread, size=(len(anchored), 2))
+
+    if len(floating):
+        if known.any():
+            low = positions[known].min(axis=0)
+            high = positions[known].max(axis=0)
+        else:
+            low, high = np.zeros(2), np.full(2, math.sqrt(count) * 60.0)
+        positions[floating] = rng.uniform(low, np.maximum(high, low + 1), size=(len(floating), 2))
+    return positions
+
+
+def incremental_layout(positions, known, edges, iterations=20, seed=None):
+    positions = place_new_nodes(positions, known, edges, seed=seed)
+    return force_directed_layout(
+        len(positions), edges, positions=positions, fixed=known,
+        iterations=iterations, temperature=60.0, seed=seed
+    )
+
+
+def apply_positions(devices, positions):
+    return [
+        (device_type, type_id, float(x), float(y))
+        for (device_type, type_id, _, _), (x, y) in zip(devices, positions)
+    ]
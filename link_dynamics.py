@@ -0,0 +1,177 @@
+import csv
+
+import numpy as np
+
+from bellman_ford import bellman_ford
+
+
+class CostSchedule:
+    # Costs are sampled on a shared time grid: costs[step, i] is the cost of
+    # links[i] from times[step] until the next step.
+    def __init__(self, times, links, costs):
+        self.times = np.asarray(times, dtype=float)
+        self.links = [(min(d1, d2), max(d1, d2)) for d1, d2 in links]
+        self.costs = np.asarray(costs, dtype=float).reshape(len(self.times), len(self.links))
+
+    def __len__(self):
+        return len(self.times)
+
+
+def label_key(label):
+    return ''.join(label.split()).lower()
+
+
+def device_index(value, labels):
+    # Devices are named by the "Type N" labels shown in the GUI; bare numbers
+    # are taken as device indices for graphs that have no labels.
+    value = value.strip()
+    if labels is not None:
+        index = labels.get(label_key(value))
+        if index is not None:
+            return index
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Cost schedule refers to unknown device '{value}'")
+
+
+def load_cost_schedule(file_path, base_costs, labels=None):
+    # Rows are "time,device1,device2,cost"; a link keeps its last cost until
+    # the file changes it again, and starts at its base cost. labels maps
+    # device labels such as "Router 3" to indices.
+    if labels is not None:
+        labels = {label_key(label): index for label, index in labels.items()}
+
+    events = []
+    with open(file_path, newline='') as f:
+        for row in csv.reader(f):
+            if not row or row[0].strip().startswith('#') or row[0].strip().lower() == 'time':
+                continue
+            time, d1, d2, cost = row[:4]
+            d1, d2 = device_index(d1, labels), device_index(d2, labels)
+            events.append((float(time), (min(d1, d2), max(d1, d2)), float(cost)))
+
+    links = list(base_costs)
+    column = {link: i for i, link in enumerate(links)}
+    times = sorted({time for time, _, _ in events})
+    row_of = {time: i for i, time in enumerate(times)}
+
+    costs = np.full((len(times), len(links)), np.nan)
+    for time, link, cost in events:
+        if link not in column:
+            raise ValueError(f"Cost schedule refers to unknown connection {link}")
+        costs[row_of[time], column[link]] = cost
+
+    previous = np.array([base_costs[link] for link in links], dtype=float)
+    for step in range(len(times)):
+        missing = np.isnan(costs[step])
+        costs[step, missing] = previous[missing]
+        previous = costs[step]
+
+    return CostSchedule(times, links, costs)
+
+
+def random_walk_schedule(base_costs, steps, volatility=0.2, change_probability=0.05, seed=None):
+    # Each step a few links drift multiplicatively; costs never drop below 1.
+    rng = np.random.default_rng(seed)
+    links = list(base_costs)
+    base = np.array([base_costs[link] for link in links], dtype=float)
+
+    changes = rng.random((steps, len(links))) < change_probability
+    factors = np.where(changes, np.exp(rng.normal(0, volatility, size=(steps, len(links)))), 1.0)
+    costs = np.maximum(base * np.cumprod(factors, axis=0), 1.0)
+    return CostSchedule(np.arange(steps, dtype=float), links, np.round(costs, 3))
+
+
+def diurnal_schedule(base_costs, steps, period=24, amplitude=0.5, seed=None):
+    # Load-driven cost that peaks once per period, with a random phase per link.
+    rng = np.random.default_rng(seed)
+    links = list(base_costs)
+    base = np.array([base_costs[link] for link in links], dtype=float)
+    phase = rng.uniform(0, 2 * np.pi, size=len(links))
+
+    t = np.arange(steps, dtype=float)[:, None]
+    costs = base * (1 + amplitude * (1 + np.sin(2 * np.pi * t / period + phase)) / 2)
+    return CostSchedule(t.ravel(), links, np.round(costs, 1))
+
+
+class StepResult:
+    __slots__ = ('time', 'source', 'changed_links', 'passes', 'relaxations', 'route_changes')
+
+    def __init__(self, time, source, changed_links, passes, relaxations, route_changes):
+        self.time = time
+        self.source = source
+        self.changed_links = changed_links
+        self.passes = passes
+        self.relaxations = relaxations
+        self.route_changes = route_changes
+
+
+class DynamicRouting:
+    def __init__(self, graph, schedule, sources, warm_start=True):
+        self.graph = graph
+        self.schedule = schedule
+        self.sources = list(sources)
+        self.warm_start = warm_start
+        self.routes = {}
+        self.results = []
+        self.flaps = {}
+
+    def apply_costs(self, step):
+        costs = self.schedule.costs[step]
+        if step == 0:
+            changed = np.arange(len(costs))
+        else:
+            changed = np.flatnonzero(costs != self.schedule.costs[step - 1])
+
+        for i in changed.tolist():
+            d1, d2 = self.schedule.links[i]
+            weight = float(costs[i])
+            if self.graph.has_edge(d1, d2):
+                self.graph[d1][d2]['weight'] = weight
+            if self.graph.has_edge(d2, d1):
+                self.graph[d2][d1]['weight'] = weight
+        return len(changed)
+
+    def step(self, step):
+        changed_links = self.apply_costs(step)
+        time = float(self.schedule.times[step])
+
+        for source in self.sources:
+            previous = self.routes.get(source)
+            stats = {}
+            warm = previous if self.warm_start else None
+            distances, predecessors = bellman_ford(self.graph, source, warm_start=warm, stats=stats)
+
+            route_changes = 0
+            if previous is not None:
+                old_predecessors = previous[1]
+                for node, parent in predecessors.items():
+                    if old_predecessors.get(node) != parent:
+                        route_changes += 1
+                        key = (source, node)
+                        self.flaps[key] = self.flaps.get(key, 0) + 1
+
+            self.routes[source] = (distances, predecessors)
+            self.results.append(StepResult(time, source, changed_links, stats['passes'], stats['relaxations'], route_changes))
+
+    def run(self):
+        for step in range(len(self.schedule)):
+            self.step(step)
+        return self
+
+    def summary(self):
+        passes = [result.passes for result in self.results]
+        return {
+            'steps': len(self.schedule),
+            'sources': len(self.sources),
+            'route_changes': sum(result.route_changes for result in self.results),
+            'mean_passes': float(np.mean(passes)) if passes else 0.0,
+            'max_passes': max(passes, default=0),
+            'relaxations': sum(result.relaxations for result in self.results),
+            'flapping_routes': sum(1 for count in self.flaps.values() if count > 1)
+        }
+
+
+def simulate_link_dynamics(graph, schedule, sources, warm_start=True):
+    return DynamicRouting(graph, schedule, sources, warm_start).run()
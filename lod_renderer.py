@@ -0,0 +1,224 @@
+import math
+from collections import defaultdict
+
+from network_devices import DEVICE_COLORS
+
+MIN_SCALE = 0.02
+MAX_SCALE = 8.0
+LABEL_SCALE = 0.6          # labels are hidden below this zoom level
+DETAIL_BUDGET = 1500       # visible devices drawn individually before clustering kicks in
+LABEL_BUDGET = 400         # visible devices drawn with icons and labels
+CLUSTER_PIXELS = 48        # on-screen size of an aggregated cluster cell
+
+
+class Viewport:
+    def __init__(self, scale=1.0, offset_x=0.0, offset_y=0.0):
+        self.scale = scale
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+
+    def to_screen(self, x, y):
+        return (x - self.offset_x) * self.scale, (y - self.offset_y) * self.scale
+
+    def to_world(self, x, y):
+        return x / self.scale + self.offset_x, y / self.scale + self.offset_y
+
+    def zoom_at(self, x, y, factor):
+        world_x, world_y = self.to_world(x, y)
+        self.scale = min(max(self.scale * factor, MIN_SCALE), MAX_SCALE)
+        self.offset_x = world_x - x / self.scale
+        self.offset_y = world_y - y / self.scale
+
+    def pan(self, dx, dy):
+        self.offset_x -= dx / self.scale
+        self.offset_y -= dy / self.scale
+
+    def fit(self, bounds, width, height, margin=40):
+        x0, y0, x1, y1 = bounds
+        span_x = max(x1 - x0, 1)
+        span_y = max(y1 - y0, 1)
+        self.scale = min(max(min((width - 2 * margin) / span_x, (height - 2 * margin) / span_y), MIN_SCALE), MAX_SCALE)
+        self.offset_x = x0 - (width / self.scale - span_x) / 2
+        self.offset_y = y0 - (height / self.scale - span_y) / 2
+
+
+class SpatialGrid:
+    def __init__(self, cell_size=100):
+        self.cell_size = cell_size
+        self.cells = defaultdict(set)
+
+    def cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def build(self, devices):
+        self.cells = defaultdict(set)
+        for i, device in enumerate(devices):
+            self.cells[self.cell(device[2], device[3])].add(i)
+
+    def insert(self, device_id, x, y):
+        self.cells[self.cell(x, y)].add(device_id)
+
+    def move(self, device_id, old_x, old_y, new_x, new_y):
+        old_cell = self.cell(old_x, old_y)
+        new_cell = self.cell(new_x, new_y)
+        if old_cell != new_cell:
+            self.cells[old_cell].discard(device_id)
+            self.cells[new_cell].add(device_id)
+
+    def query(self, x0, y0, x1, y1):
+        cx0, cy0 = self.cell(x0, y0)
+        cx1, cy1 = self.cell(x1, y1)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.cells):
+            for (cx, cy), ids in self.cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    yield from ids
+        else:
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    ids = self.cells.get((cx, cy))
+                    if ids:
+                        yield from ids
+
+
+class LODRenderer:
+    def __init__(self, canvas, viewport=None):
+        self.canvas = canvas
+        self.viewport = viewport or Viewport()
+        self.grid = SpatialGrid()
+        self.adjacency = defaultdict(list)
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+
+    def refresh(self, devices, connections):
+        if not self.dirty:
+            return
+        self.grid.build(devices)
+        self.adjacency = defaultdict(list)
+        for d1, d2 in connections:
+            self.adjacency[d1].append(d2)
+            self.adjacency[d2].append(d1)
+        self.dirty = False
+
+    def neighbors(self, devices, connections, device_id):
+        self.refresh(devices, connections)
+        return self.adjacency.get(device_id, ())
+
+    def device_at(self, devices, connections, x, y, radius):
+        self.refresh(devices, connections)
+        best = None
+        best_distance = None
+        for i in self.grid.query(x - radius, y - radius, x + radius, y + radius):
+            dx = abs(x - devices[i][2])
+            dy = abs(y - devices[i][3])
+            if dx < radius and dy < radius and (best is None or dx + dy < best_distance):
+                best = i
+                best_distance = dx + dy
+        return best
+
+    def visible_devices(self, devices, connections, margin=40):
+        self.refresh(devices, connections)
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        x0, y0 = self.viewport.to_world(-margin, -margin)
+        x1, y1 = self.viewport.to_world(width + margin, height + margin)
+        return [
+            i for i in self.grid.query(x0, y0, x1, y1)
+            if x0 <= devices[i][2] <= x1 and y0 <= devices[i][3] <= y1
+        ]
+
+    def render(self, devices, connections, draw_device):
+        self.canvas.delete("network")
+        visible = self.visible_devices(devices, connections)
+
+        if len(visible) > DETAIL_BUDGET:
+            self.render_clusters(devices, visible)
+            return
+
+        labels = self.viewport.scale >= LABEL_SCALE and len(visible) <= LABEL_BUDGET
+        self.render_links(devices, visible)
+        for i in visible:
+            device_type, type_id, x, y = devices[i]
+            if labels:
+                draw_device(i, device_type, type_id, x, y)
+            else:
+                self.draw_dot(i, device_type, x, y)
+
+    def render_links(self, devices, visible):
+        # Links are found through the adjacency of visible devices, so a long
+        # link that crosses the screen with both endpoints off-screen is culled.
+        visible_set = set(visible)
+        to_screen = self.viewport.to_screen
+        create_line = self.canvas.create_line
+        for d1 in visible:
+            x1, y1 = to_screen(devices[d1][2], devices[d1][3])
+            for d2 in self.adjacency.get(d1, ()):
+                if d2 in visible_set and d2 < d1:
+                    continue
+                x2, y2 = to_screen(devices[d2][2], devices[d2][3])
+                create_line(
+                    x1, y1, x2, y2,
+                    tags=(f"connection_{min(d1, d2)}_{max(d1, d2)}", "connection", "network"),
+                    width=2 if self.viewport.scale >= LABEL_SCALE else 1
+                )
+
+    def draw_dot(self, device_id, device_type, x, y):
+        sx, sy = self.viewport.to_screen(x, y)
+        size = max(3, min(30 * self.viewport.scale, 12))
+        self.canvas.create_oval(
+            sx - size / 2, sy - size / 2,
+            sx + size / 2, sy + size / 2,
+            fill=DEVICE_COLORS[device_type],
+            outline="",
+            tags=(f"device_{device_id}", "network")
+        )
+
+    def render_clusters(self, devices, visible):
+        cell_size = CLUSTER_PIXELS / self.viewport.scale
+
+        def cluster_of(i):
+            return int(devices[i][2] // cell_size), int(devices[i][3] // cell_size)
+
+        counts = defaultdict(int)
+        for i in visible:
+            counts[cluster_of(i)] += 1
+
+        visible_set = set(visible)
+        bundles = defaultdict(int)
+        for d1 in visible:
+            c1 = cluster_of(d1)
+            for d2 in self.adjacency.get(d1, ()):
+                if d2 in visible_set and d2 < d1:
+                    continue
+                c2 = cluster_of(d2)
+                if c1 != c2:
+                    bundles[(min(c1, c2), max(c1, c2))] += 1
+
+        to_screen = self.viewport.to_screen
+        for (c1, c2), count in bundles.items():
+            x1, y1 = to_screen((c1[0] + 0.5) * cell_size, (c1[1] + 0.5) * cell_size)
+            x2, y2 = to_screen((c2[0] + 0.5) * cell_size, (c2[1] + 0.5) * cell_size)
+            self.canvas.create_line(
+                x1, y1, x2, y2,
+                width=min(1 + math.log2(count), 8),
+                fill="#9E9E9E",
+                tags=("bundle", "network")
+            )
+
+        for (cx, cy), count in counts.items():
+            sx, sy = to_screen((cx + 0.5) * cell_size, (cy + 0.5) * cell_size)
+            radius = min(4 + 2 * math.log2(count), CLUSTER_PIXELS / 2)
+            self.canvas.create_oval(
+                sx - radius, sy - radius, sx + radius, sy + radius,
+                fill="#90CAF9",
+                outline="#1976D2",
+                tags=("cluster", "network")
+            )
+            if count > 1 and radius >= 10:
+                self.canvas.create_text(
+                    sx, sy,
+                    text=str(count),
+                    font=("Arial", 7),
+                    tags=("cluster", "network")
+                )
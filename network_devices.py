@@ -17,3 +17,15 @@ DEVICE_COLORS = {
     DeviceType.SWITCH: "#98FB98",   # Light green
     DeviceType.ROUTER: "#FFB6C1"    # Light pink
 } 
+
+# Default cost of a link between two device types; pairs not listed cost 1.
+LINK_COSTS = {
+    frozenset((DeviceType.PC, DeviceType.SWITCH)): 1,
+    frozenset((DeviceType.PC, DeviceType.ROUTER)): 2,
+    frozenset((DeviceType.SWITCH, DeviceType.ROUTER)): 2,
+    frozenset((DeviceType.ROUTER,)): 3,
+    frozenset((DeviceType.SWITCH,)): 2
+}
+
+def link_cost(type1, type2, costs=LINK_COSTS):
+    return costs.get(frozenset((type1, type2)), 1)
@@ -1,11 +1,21 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import numpy as np
 import networkx as nx
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from bellman_ford import bellman_ford, get_shortest_path
-from network_devices import DeviceType, DEVICE_ICONS, DEVICE_COLORS
+from bellman_ford import bellman_ford, get_shortest_path, shortest_path
+from traffic_simulator import Flow, simulate
+from async_jobs import AsyncJobRunner
+from lod_renderer import LODRenderer
+from raster_layer import RasterLayer
+from topology_import import read_edge_list, build_topology
+from forwarding import build_and_export
+from topology_history import TopologyHistory
+from link_dynamics import load_cost_schedule, random_walk_schedule, simulate_link_dynamics
+from sweep_runner import ResultStore, pending_scenarios, run_one
+from layout_engine import hierarchical_layout, force_directed_layout, incremental_layout, apply_positions
+from network_devices import DeviceType, DEVICE_ICONS, DEVICE_COLORS, link_cost
 from PIL import Image, ImageTk
 import os
 import json
@@ -28,14 +38,27 @@ class NetworkSimulator:
         }
         self.source_var = tk.StringVar()
         self.target_var = tk.StringVar()
+        self.raster_mode = tk.BooleanVar(value=False)
         self.devices = []
         self.connections = []
+        self.connection_set = set()
+        self.layout_count = 0
         self.selected_device = None
         self.connecting_device = None
         self.dragging_device = None
         self.drag_start_x = None
         self.drag_start_y = None
+        self.history = TopologyHistory(counters=self.device_counters)
+        self.path_cache = {}
+        self.sweep = None
+        self.highlighted = None
+        self.highlight_generation = 0
+        self.job_progress = (0, 0)
         self.setup_gui()
+        self.jobs = AsyncJobRunner(self.root, on_progress=self.show_job_progress)
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
+        self.root.protocol("WM_DELETE_WINDOW", self.close_application)
 
     def configure_styles(self):
         self.colors = {
@@ -129,6 +152,11 @@ class NetworkSimulator:
         
         self.file_menu.add_command(label="Save Network 💾", command=self.save_network, font=('Helvetica', 10))
         self.file_menu.add_command(label="Open Network 📂", command=self.load_network, font=('Helvetica', 10))
+        self.file_menu.add_command(label="Import Edge List 📥", command=self.import_edge_list, font=('Helvetica', 10))
+        self.file_menu.add_command(label="Export Forwarding Tables 🧾", command=self.export_forwarding_tables, font=('Helvetica', 10))
+        self.file_menu.add_command(label="Load Cost Schedule 📈", command=self.load_cost_schedule, font=('Helvetica', 10))
+        self.file_menu.add_command(label="Simulate Link Drift 🎲", command=self.simulate_link_drift, font=('Helvetica', 10))
+        self.file_menu.add_command(label="Run Scenario Sweep 🧪", command=self.run_scenario_sweep, font=('Helvetica', 10))
         self.file_menu.add_separator()
         self.file_menu.add_command(label="Close Network ❌", command=self.close_network, font=('Helvetica', 10))
 
@@ -143,6 +171,62 @@ class NetworkSimulator:
         )
         file_button.pack(side="left", padx=5)
 
+        self.layout_menu = tk.Menu(
+            self.toolbar,
+            tearoff=0,
+            bg=self.colors['primary'],
+            fg='white',
+            activebackground=self.colors['primary_hover'],
+            activeforeground='white',
+            font=('Helvetica', 10),
+            relief='flat',
+            bd=0
+        )
+
+        self.layout_menu.add_command(label="Hierarchical", command=lambda: self.auto_layout('hierarchical'), font=('Helvetica', 10))
+        self.layout_menu.add_command(label="Force-Directed", command=lambda: self.auto_layout('force'), font=('Helvetica', 10))
+        self.layout_menu.add_command(label="Place New Devices", command=lambda: self.auto_layout('incremental'), font=('Helvetica', 10))
+
+        layout_button = ttk.Button(
+            self.toolbar,
+            text="Layout 🧭",
+            style='Action.TButton',
+            command=lambda e=None: self.layout_menu.post(
+                layout_button.winfo_rootx(),
+                layout_button.winfo_rooty() + layout_button.winfo_height()
+            )
+        )
+        layout_button.pack(side="left", padx=5)
+
+        self.history_menu = tk.Menu(
+            self.toolbar,
+            tearoff=0,
+            bg=self.colors['primary'],
+            fg='white',
+            activebackground=self.colors['primary_hover'],
+            activeforeground='white',
+            font=('Helvetica', 10),
+            relief='flat',
+            bd=0
+        )
+
+        self.history_menu.add_command(label="Undo ↩️", command=self.undo, font=('Helvetica', 10))
+        self.history_menu.add_command(label="Redo ↪️", command=self.redo, font=('Helvetica', 10))
+        self.history_menu.add_separator()
+        self.history_menu.add_command(label="Save Snapshot 📌", command=self.save_snapshot, font=('Helvetica', 10))
+        self.history_menu.add_command(label="Restore Snapshot 🔁", command=self.restore_snapshot, font=('Helvetica', 10))
+
+        history_button = ttk.Button(
+            self.toolbar,
+            text="History 🕘",
+            style='Action.TButton',
+            command=lambda e=None: self.history_menu.post(
+                history_button.winfo_rootx(),
+                history_button.winfo_rooty() + history_button.winfo_height()
+            )
+        )
+        history_button.pack(side="left", padx=5)
+
         for device_type in DeviceType:
             btn = ttk.Button(
                 self.toolbar,
@@ -180,6 +264,13 @@ class NetworkSimulator:
             command=self.show_connection_rules
         ).pack(side="right", padx=5)
 
+        ttk.Checkbutton(
+            self.toolbar,
+            text="Raster View 🖼️",
+            variable=self.raster_mode,
+            command=self.toggle_raster_mode
+        ).pack(side="right", padx=5)
+
         path_frame = ttk.Frame(self.toolbar, style='Toolbar.TFrame')
         path_frame.pack(side="left", padx=10)
 
@@ -222,6 +313,13 @@ class NetworkSimulator:
             command=self.find_shortest_path
         ).pack(side="left", padx=5)
 
+        ttk.Button(
+            path_frame,
+            text="Simulate Traffic 📶",
+            style='Action.TButton',
+            command=self.simulate_traffic
+        ).pack(side="left", padx=5)
+
     def create_canvas(self):
         self.canvas = tk.Canvas(
             self.canvas_frame,
@@ -232,11 +330,20 @@ class NetworkSimulator:
             bd=2
         )
         self.canvas.pack(fill="both", expand=True, padx=5, pady=5)
+        self.renderer = LODRenderer(self.canvas)
+        self.raster = RasterLayer(self.canvas, self.renderer)
+        self.redraw_pending = False
+        self.pan_start = None
         
         self.canvas.bind("<Button-1>", self.canvas_clicked)
         self.canvas.bind("<B1-Motion>", self.canvas_drag)
         self.canvas.bind("<ButtonRelease-1>", self.canvas_release)
         self.canvas.bind("<Motion>", self.canvas_motion)
+        self.canvas.bind("<MouseWheel>", self.canvas_zoom)
+        self.canvas.bind("<Button-4>", self.canvas_zoom)
+        self.canvas.bind("<Button-5>", self.canvas_zoom)
+        self.canvas.bind("<ButtonPress-3>", self.canvas_pan_start)
+        self.canvas.bind("<B3-Motion>", self.canvas_pan)
 
     def set_selected_device(self, device_type):
         self.selected_device = device_type
@@ -259,7 +366,7 @@ class NetworkSimulator:
         self.canvas.config(cursor="X_cursor")
 
     def canvas_clicked(self, event):
-        x, y = event.x, event.y
+        x, y = self.renderer.viewport.to_world(event.x, event.y)
         
         if self.selected_device:
             type_specific_id = self.get_next_device_id(self.selected_device)
@@ -267,6 +374,9 @@ class NetworkSimulator:
             self.devices.append((self.selected_device, type_specific_id, x, y))
             self.draw_device(device_id, self.selected_device, type_specific_id, x, y)
             self.update_device_combos()
+            self.topology_changed()
+            self.raster.invalidate_device(self.devices, device_id)
+            self.history.add_device(self.devices[device_id], self.device_counters)
         
         elif self.canvas.cget('cursor') == 'X_cursor':
             device_id = self.find_device_at_position(x, y)
@@ -290,17 +400,23 @@ class NetworkSimulator:
             device_id = self.find_device_at_position(x, y)
             if device_id is not None:
                 self.dragging_device = device_id
-                self.drag_start_x = x
-                self.drag_start_y = y
+                self.drag_start_x = event.x
+                self.drag_start_y = event.y
+                if self.raster_mode.get():
+                    self.raster.exclude(self.devices, device_id, self.renderer.neighbors(self.devices, self.connections, device_id))
+                    self.redraw_network()
 
     def canvas_drag(self, event):
         if self.dragging_device is not None:
-            dx = event.x - self.drag_start_x
-            dy = event.y - self.drag_start_y
+            scale = self.renderer.viewport.scale
+            dx = (event.x - self.drag_start_x) / scale
+            dy = (event.y - self.drag_start_y) / scale
             
             device = list(self.devices[self.dragging_device])
             new_x = device[2] + dx
             new_y = device[3] + dy
+            if not self.renderer.dirty:
+                self.renderer.grid.move(self.dragging_device, device[2], device[3], new_x, new_y)
             
             device[2] = new_x
             device[3] = new_y
@@ -316,38 +432,70 @@ class NetworkSimulator:
 
     def canvas_release(self, event):
         if self.dragging_device is not None:
-            self.canvas.delete("highlight")
+            device_id = self.dragging_device
+            self.clear_highlight()
             self.dragging_device = None
             self.drag_start_x = None
             self.drag_start_y = None
+            if self.raster_mode.get():
+                self.raster.include(self.devices, device_id, self.renderer.neighbors(self.devices, self.connections, device_id))
+                self.redraw_network()
+            if self.devices[device_id] != self.history.current.devices[device_id]:
+                self.history.move_device(device_id, self.devices[device_id])
 
     def canvas_motion(self, event):
         if self.connecting_device is not None:
             self.canvas.delete("temp_line")
             start_device = self.devices[self.connecting_device]
+            start_x, start_y = self.renderer.viewport.to_screen(start_device[2], start_device[3])
             
-            target_device = self.find_device_at_position(event.x, event.y)
+            target_device = self.find_device_at_position(*self.renderer.viewport.to_world(event.x, event.y))
             if target_device is not None and target_device != self.connecting_device:
                 self.canvas.create_line(
-                    start_device[2], start_device[3],
+                    start_x, start_y,
                     event.x, event.y,
                     tags="temp_line",
                     dash=(4, 2)
                 )
 
+    def canvas_zoom(self, event):
+        if event.num == 5 or getattr(event, 'delta', 0) < 0:
+            factor = 1 / 1.2
+        else:
+            factor = 1.2
+        self.renderer.viewport.zoom_at(event.x, event.y, factor)
+        self.schedule_redraw()
+
+    def canvas_pan_start(self, event):
+        self.pan_start = (event.x, event.y)
+
+    def canvas_pan(self, event):
+        if self.pan_start is None:
+            return
+        self.renderer.viewport.pan(event.x - self.pan_start[0], event.y - self.pan_start[1])
+        self.pan_start = (event.x, event.y)
+        self.schedule_redraw()
+
+    def schedule_redraw(self):
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            self.root.after_idle(self.redraw_network)
+
     def draw_device(self, device_id, device_type, type_specific_id, x, y):
+        x, y = self.renderer.viewport.to_screen(x, y)
+        tags = (f"device_{device_id}", "network")
         if self.device_images:
             image = self.device_images[device_type]
             self.canvas.create_image(
                 x, y,
                 image=image,
-                tags=f"device_{device_id}"
+                tags=tags
             )
             
             self.canvas.create_text(
                 x, y + 20,
                 text=f"{device_type.value}\n{type_specific_id}",
-                tags=f"device_{device_id}",
+                tags=tags,
                 fill="black",
                 font=("Arial", 8),
                 justify="center"
@@ -360,38 +508,38 @@ class NetworkSimulator:
                 x-size/2, y-size/2,
                 x+size/2, y+size/2,
                 fill=color,
-                tags=f"device_{device_id}"
+                tags=tags
             )
             
             self.canvas.create_text(
                 x, y,
                 text=f"{device_type.value}\n{type_specific_id}",
-                tags=f"device_{device_id}"
+                tags=tags
             )
 
     def draw_connection(self, device1_id, device2_id):
-        d1 = self.devices[device1_id]
-        d2 = self.devices[device2_id]
+        x1, y1 = self.renderer.viewport.to_screen(*self.devices[device1_id][2:])
+        x2, y2 = self.renderer.viewport.to_screen(*self.devices[device2_id][2:])
         
         conn_id = f"connection_{min(device1_id, device2_id)}_{max(device1_id, device2_id)}"
         
         if self.dragging_device is not None:
             self.canvas.create_line(
-                d1[2], d1[3], d2[2], d2[3],
-                tags=(conn_id, "connection"),
+                x1, y1, x2, y2,
+                tags=(conn_id, "connection", "network"),
                 width=2
             )
             return
         
         steps = 20
-        dx = (d2[2] - d1[2]) / steps
-        dy = (d2[3] - d1[3]) / steps
+        dx = (x2 - x1) / steps
+        dy = (y2 - y1) / steps
         
         def animate_connection(step):
             if step <= steps:
                 progress = step/steps
-                end_x = d1[2] + dx * step
-                end_y = d1[3] + dy * step
+                end_x = x1 + dx * step
+                end_y = y1 + dy * step
                 
                 self.canvas.delete(conn_id)
                 
@@ -400,8 +548,8 @@ class NetworkSimulator:
                 dash_offset = -int(progress * dash_length * 2)
                 
                 self.canvas.create_line(
-                    d1[2], d1[3], end_x, end_y,
-                    tags=(conn_id, "connection"),
+                    x1, y1, end_x, end_y,
+                    tags=(conn_id, "connection", "network"),
                     width=2,
                     dash=dash_pattern,
                     dashoffset=dash_offset
@@ -411,25 +559,22 @@ class NetworkSimulator:
                     self.root.after(20, lambda: animate_connection(step + 1))
                 else:
                     self.canvas.create_line(
-                        d1[2], d1[3], d2[2], d2[3],
-                        tags=(conn_id, "connection"),
+                        x1, y1, x2, y2,
+                        tags=(conn_id, "connection", "network"),
                         width=2
                     )
         
         animate_connection(1)
 
     def update_connections_for_device(self, device_id):
-        for d1, d2 in self.connections:
-            if d1 == device_id or d2 == device_id:
-                conn_id = f"connection_{min(d1, d2)}_{max(d1, d2)}"
-                self.canvas.delete(conn_id)
-                self.draw_connection(d1, d2)
+        for other in self.renderer.neighbors(self.devices, self.connections, device_id):
+            conn_id = f"connection_{min(device_id, other)}_{max(device_id, other)}"
+            self.canvas.delete(conn_id)
+            self.draw_connection(device_id, other)
 
     def find_device_at_position(self, x, y):
-        for i, (_, _, dev_x, dev_y) in enumerate(self.devices):
-            if abs(x - dev_x) < 20 and abs(y - dev_y) < 20:
-                return i
-        return None
+        radius = 20 / self.renderer.viewport.scale
+        return self.renderer.device_at(self.devices, self.connections, x, y, radius)
 
     def get_next_device_id(self, device_type):
         next_id = self.device_counters[device_type]
@@ -442,91 +587,222 @@ class NetworkSimulator:
         self.target_combo['values'] = device_list
 
     def calculate_edge_cost(self, device1_id, device2_id):
-        d1_type = self.devices[device1_id][0]
-        d2_type = self.devices[device2_id][0]
-        
-        if (d1_type == DeviceType.PC and d2_type == DeviceType.SWITCH) or \
-           (d2_type == DeviceType.PC and d1_type == DeviceType.SWITCH):
-            return 1
-        elif (d1_type == DeviceType.PC and d2_type == DeviceType.ROUTER) or \
-             (d2_type == DeviceType.PC and d1_type == DeviceType.ROUTER):
-            return 2
-        elif (d1_type == DeviceType.SWITCH and d2_type == DeviceType.ROUTER) or \
-             (d2_type == DeviceType.SWITCH and d1_type == DeviceType.ROUTER):
-            return 2
-        elif d1_type == DeviceType.ROUTER and d2_type == DeviceType.ROUTER:
-            return 3
-        elif d1_type == DeviceType.SWITCH and d2_type == DeviceType.SWITCH:
-            return 2
-        return 1
+        return link_cost(self.devices[device1_id][0], self.devices[device2_id][0])
 
     def find_shortest_path(self):
-        self.canvas.delete("highlight")
+        self.clear_highlight()
         
         if not self.source_var.get() or not self.target_var.get():
             messagebox.showwarning("Error", "Please select source and target devices")
             return
         
-        try:    
-            source_parts = self.source_var.get().split()
-            target_parts = self.target_var.get().split()
-            
-            source_type = ' '.join(source_parts[:-1])
-            target_type = ' '.join(target_parts[:-1])
-            source_type_id = int(source_parts[-1])
-            target_type_id = int(target_parts[-1])
-            
-            source_id = None
-            target_id = None
-            for i, (dev_type, type_id, _, _) in enumerate(self.devices):
-                if dev_type.value == source_type and type_id == source_type_id:
-                    source_id = i
-                if dev_type.value == target_type and type_id == target_type_id:
-                    target_id = i
-                    
+        try:
+            source_id, target_id = self.get_selected_device_ids()
             if source_id is None or target_id is None:
                 messagebox.showerror("Error", "Could not find selected devices")
                 return
                 
-            G = nx.Graph()
-            
-            for i in range(len(self.devices)):
-                G.add_node(i)
-            
-            for d1, d2 in self.connections:
-                weight = self.calculate_edge_cost(d1, d2)
-                G.add_edge(d1, d2, weight=weight)
-                G.add_edge(d2, d1, weight=weight)
-            
-            if not nx.has_path(G, source_id, target_id):
-                messagebox.showwarning("No Path", "No path exists between selected devices!")
+            cache_key = (self.history.current.id, source_id, target_id)
+            if cache_key in self.path_cache:
+                self.shortest_path_ready(self.path_cache[cache_key])
                 return
             
-            try:
-                path = nx.shortest_path(G, source_id, target_id, weight='weight')
-                total_cost = nx.shortest_path_length(G, source_id, target_id, weight='weight')
-                self.highlight_path(path, total_cost)
-            except nx.NetworkXNoPath:
-                messagebox.showwarning("No Path", "No path exists between selected devices!")
+            self.jobs.cancel('routing')
+            self.jobs.submit(
+                'routing', shortest_path, self.build_routing_graph(), source_id, target_id,
+                on_done=lambda result: self.cache_shortest_path(cache_key, result),
+                on_error=self.job_failed
+            )
                 
         except ValueError as e:
             messagebox.showerror("Error", "Invalid source or target selection")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
+    def get_selected_device_ids(self):
+        return self.find_device_id(self.source_var.get()), self.find_device_id(self.target_var.get())
+
+    def find_device_id(self, label):
+        parts = label.split()
+        device_type = ' '.join(parts[:-1])
+        device_type_id = int(parts[-1])
+
+        for i, (dev_type, type_id, _, _) in enumerate(self.devices):
+            if dev_type.value == device_type and type_id == device_type_id:
+                return i
+        return None
+
+    def build_routing_graph(self):
+        G = nx.DiGraph()
+        G.add_nodes_from(range(len(self.devices)))
+
+        for d1, d2 in self.connections:
+            weight = self.calculate_edge_cost(d1, d2)
+            G.add_edge(d1, d2, weight=weight)
+            G.add_edge(d2, d1, weight=weight)
+        return G
+
+    def simulate_traffic(self, rate=1000, packet_size=1500, duration=1.0):
+        if not self.source_var.get() or not self.target_var.get():
+            messagebox.showwarning("Error", "Please select source and target devices")
+            return
+
+        try:
+            source_id, target_id = self.get_selected_device_ids()
+            if source_id is None or target_id is None:
+                messagebox.showerror("Error", "Could not find selected devices")
+                return
+
+            flows = [Flow(source_id, target_id, rate, packet_size, stop=duration, poisson=True)]
+            self.jobs.cancel('simulation')
+            self.jobs.submit(
+                'simulation', simulate, self.build_routing_graph(), flows, duration,
+                on_done=self.traffic_report_ready,
+                on_error=self.job_failed
+            )
+        except ValueError:
+            messagebox.showerror("Error", "Invalid source or target selection")
+        except Exception as e:
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+
+    def cache_shortest_path(self, cache_key, result):
+        if len(self.path_cache) >= 256:
+            self.path_cache.pop(next(iter(self.path_cache)))
+        self.path_cache[cache_key] = result
+        self.shortest_path_ready(result)
+
+    def shortest_path_ready(self, result):
+        path, total_cost = result
+        if not path:
+            messagebox.showwarning("No Path", "No path exists between selected devices!")
+            return
+        self.highlight_path(path, total_cost)
+
+    def traffic_report_ready(self, report):
+        summary = report.summary()
+        if summary['mean_latency'] is None:
+            messagebox.showwarning("Traffic Simulation", f"Packets sent: {summary['sent']}\nNo packets were delivered.")
+            return
+
+        messagebox.showinfo(
+            "Traffic Simulation",
+            f"Packets sent: {summary['sent']}\n"
+            f"Delivered: {summary['delivered']}\n"
+            f"Dropped: {summary['dropped']} (no route: {summary['no_route']})\n"
+            f"Throughput: {summary['throughput_bps'] / 1e6:.2f} Mbit/s\n"
+            f"Mean latency: {summary['mean_latency'] * 1000:.3f} ms\n"
+            f"99th percentile latency: {summary['latency_percentiles'][99] * 1000:.3f} ms"
+        )
+
+    def job_failed(self, error):
+        messagebox.showerror("Error", f"An error occurred: {str(error)}")
+
+    def show_job_progress(self, completed, submitted):
+        self.job_progress = (completed, submitted)
+        self.canvas.delete("job_progress")
+        if not submitted:
+            return
+
+        width = 160
+        height = 14
+        x = 10
+        y = self.canvas.winfo_height() - height - 10
+        self.canvas.create_rectangle(
+            x, y, x + width, y + height,
+            fill='white',
+            outline=self.colors['primary'],
+            tags="job_progress"
+        )
+        self.canvas.create_rectangle(
+            x, y, x + width * completed / submitted, y + height,
+            fill=self.colors['primary'],
+            width=0,
+            tags="job_progress"
+        )
+        self.canvas.create_text(
+            x + width + 8, y + height / 2,
+            text=f"Computing... {completed}/{submitted}",
+            anchor="w",
+            font=('Helvetica', 9),
+            tags="job_progress"
+        )
+
+    def cancel_topology_jobs(self):
+        # Sweeps and exports work on their own copy of a topology and keep running.
+        for group in ('routing', 'simulation', 'layout'):
+            self.jobs.cancel(group)
+
+    def topology_changed(self):
+        self.cancel_topology_jobs()
+        self.renderer.invalidate()
+        self.clear_highlight()
+
+    def undo(self):
+        version = self.history.undo()
+        if version is not None:
+            self.apply_version(version)
+
+    def redo(self):
+        version = self.history.redo()
+        if version is not None:
+            self.apply_version(version)
+
+    def save_snapshot(self):
+        name = simpledialog.askstring("Save Snapshot", "Snapshot name:", parent=self.root)
+        if name:
+            self.history.snapshot(name)
+
+    def restore_snapshot(self):
+        if not self.history.snapshots:
+            messagebox.showinfo("Snapshots", "No snapshots have been saved yet.")
+            return
+        
+        names = ", ".join(self.history.snapshots)
+        name = simpledialog.askstring("Restore Snapshot", f"Snapshot to restore ({names}):", parent=self.root)
+        if not name:
+            return
+        if name not in self.history.snapshots:
+            messagebox.showerror("Error", f"No snapshot named '{name}'")
+            return
+        self.apply_version(self.history.restore(name))
+
+    def apply_version(self, version):
+        self.cancel_topology_jobs()
+        self.devices = list(version.devices)
+        self.connections = sorted(version.connections)
+        self.connection_set = set(self.connections)
+        self.device_counters = dict(version.counters)
+        self.layout_count = min(self.layout_count, len(self.devices))
+        self.connecting_device = None
+        self.dragging_device = None
+        self.renderer.invalidate()
+        self.raster.reset()
+        self.raster.excluded.clear()
+        self.redraw_network()
+        self.update_device_combos()
+
+    def close_application(self):
+        self.cancel_sweep()
+        self.jobs.shutdown()
+        self.root.destroy()
+
     def highlight_path(self, path, total_cost):
-        self.canvas.delete("highlight")
+        self.clear_highlight()
+        self.highlighted = (path, total_cost)
+        generation = self.highlight_generation
         
         def animate_path(index):
+            if generation != self.highlight_generation:
+                return
             if index < len(path) - 1:
-                d1 = self.devices[path[index]]
-                d2 = self.devices[path[index + 1]]
+                x1, y1 = self.renderer.viewport.to_screen(*self.devices[path[index]][2:])
+                x2, y2 = self.renderer.viewport.to_screen(*self.devices[path[index + 1]][2:])
                 
-                self.animate_gradient_line(d1[2], d1[3], d2[2], d2[3], self.colors['success'])
+                self.animate_gradient_line(x1, y1, x2, y2, self.colors['success'])
                 
-                self.ripple_highlight(d1[2], d1[3])
+                self.ripple_highlight(x1, y1)
                 if index == len(path) - 2:
-                    self.ripple_highlight(d2[2], d2[3])
+                    self.ripple_highlight(x2, y2)
                     
                 self.root.after(500, lambda: animate_path(index + 1))
                 
@@ -535,13 +811,53 @@ class NetworkSimulator:
         
         animate_path(0)
 
+    def clear_highlight(self):
+        self.canvas.delete("highlight")
+        self.highlighted = None
+        self.highlight_generation += 1
+
+    def draw_highlight(self):
+        # Static version of the animated overlay, re-projected after a redraw.
+        if self.highlighted is None:
+            return
+        path, total_cost = self.highlighted
+        points = []
+        for device_id in path:
+            points.extend(self.renderer.viewport.to_screen(*self.devices[device_id][2:]))
+        if len(points) >= 4:
+            self.canvas.create_line(
+                *points,
+                fill=self.colors['success'],
+                width=4,
+                tags="highlight",
+                capstyle=tk.ROUND,
+                joinstyle=tk.ROUND
+            )
+        self.canvas.create_rectangle(
+            10, 10, 160, 50,
+            fill='white',
+            outline=self.colors['success'],
+            width=2,
+            tags=("highlight", "cost_panel")
+        )
+        self.canvas.create_text(
+            15, 25,
+            text=f"Path Cost: {total_cost}",
+            fill=self.colors['success'],
+            font=('Helvetica', 12, 'bold'),
+            anchor="w",
+            tags=("highlight", "cost_text")
+        )
+
     def animate_gradient_line(self, x1, y1, x2, y2, color):
         steps = 30
         dx = (x2 - x1) / steps
         dy = (y2 - y1) / steps
         
+        generation = self.highlight_generation
+        
         def draw_segment(step, prev_line=None):
-            if step <= steps:
+            if step <= steps and generation == self.highlight_generation:
                 if prev_line:
                     self.canvas.delete(prev_line)
                 
@@ -570,8 +886,10 @@ class NetworkSimulator:
         duration = 1000
         steps = 20
         
+        generation = self.highlight_generation
+        
         def animate_ripples(step):
-            if step < steps:
+            if step < steps and generation == self.highlight_generation:
                 self.canvas.delete("ripple")
                 
                 for ring in range(num_rings):
@@ -597,8 +915,10 @@ class NetworkSimulator:
         panel_width = 150
         panel_height = 40
         
+        generation = self.highlight_generation
+        
         def animate_panel(step, max_steps=10):
-            if step <= max_steps:
+            if step <= max_steps and generation == self.highlight_generation:
                 progress = step/max_steps
                 current_width = panel_width * progress
                 
@@ -624,8 +944,10 @@ class NetworkSimulator:
         text = f"Path Cost: {total_cost}"
         chars = list(text)
         
+        generation = self.highlight_generation
+        
         def animate_text(index):
-            if index <= len(chars):
+            if index <= len(chars) and generation == self.highlight_generation:
                 self.canvas.delete("cost_text")
                 
                 self.canvas.create_text(
@@ -682,26 +1004,41 @@ class NetworkSimulator:
                 with open(file_path, 'r') as f:
                     network_config = json.load(f)
                 
-                self.clear_network()
-                
+                # Everything is parsed before the current network is touched, so
+                # a bad file leaves both the canvas and the history as they were.
+                device_counters = None
                 if 'device_counters' in network_config:
-                    self.device_counters = {
-                        DeviceType(k): v 
+                    device_counters = {
+                        DeviceType(k): int(v) 
                         for k, v in network_config['device_counters'].items()
                     }
                 
-                for device in network_config['devices']:
-                    self.devices.append((
+                devices = [
+                    (
                         DeviceType(device['type']),
                         int(device['id']),
                         float(device['x']),
                         float(device['y'])
-                    ))
+                    )
+                    for device in network_config['devices']
+                ]
                 
-                self.connections = [
+                connections = [
                     (int(d1), int(d2)) 
                     for d1, d2 in network_config['connections']
                 ]
+                for d1, d2 in connections:
+                    if not (0 <= d1 < len(devices) and 0 <= d2 < len(devices)):
+                        raise ValueError(f"Connection ({d1}, {d2}) refers to a missing device")
+                
+                self.clear_network()
+                if device_counters is not None:
+                    self.device_counters = device_counters
+                self.devices.extend(devices)
+                self.connections = connections
+                self.connection_set = set(self.connections)
+                self.layout_count = len(self.devices)
+                self.history.replace("Open network", self.devices, self.connections, self.device_counters)
                 
                 self.redraw_network()
                 self.update_device_combos()
@@ -710,10 +1047,248 @@ class NetworkSimulator:
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load network: {str(e)}")
 
+    def import_edge_list(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Edge lists", "*.csv *.txt *.edges"), ("All files", "*.*")],
+            title="Import Edge List"
+        )
+        
+        if file_path:
+            try:
+                node_types, edges = read_edge_list(file_path)
+                result = self.import_topology(node_types, edges)
+                rejected = result.rejected
+                messagebox.showinfo(
+                    "Import Complete",
+                    f"Imported {len(result.devices)} devices and {len(result.connections)} connections.\n"
+                    f"Skipped: {rejected['pc_pc']} PC-PC, {rejected['self_loops']} self-loops, "
+                    f"{rejected['duplicates']} duplicates."
+                )
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to import edge list: {str(e)}")
+
+    def export_forwarding_tables(self):
+        routers = [i for i, device in enumerate(self.devices) if device[0] == DeviceType.ROUTER]
+        if not routers:
+            messagebox.showwarning("Error", "The network has no routers to build forwarding tables for")
+            return
+        
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".npz",
+            filetypes=[("Forwarding tables", "*.npz"), ("All files", "*.*")],
+            title="Export Forwarding Tables"
+        )
+        
+        if file_path:
+            self.jobs.submit(
+                'export', build_and_export, file_path, self.build_routing_graph(), routers,
+                on_done=lambda result: messagebox.showinfo(
+                    "Success",
+                    f"Exported forwarding tables for {result[0]} routers ({result[1]} prefixes)."
+                ),
+                on_error=self.job_failed
+            )
+
+    def base_link_costs(self):
+        return {(d1, d2): self.calculate_edge_cost(d1, d2) for d1, d2 in self.connections}
+
+    def load_cost_schedule(self):
+        file_path = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            title="Load Cost Schedule"
+        )
+        
+        if file_path:
+            try:
+                labels = {f"{d[0].value} {d[1]}": i for i, d in enumerate(self.devices)}
+                schedule = load_cost_schedule(file_path, self.base_link_costs(), labels)
+                self.run_link_dynamics(schedule)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to load cost schedule: {str(e)}")
+
+    def simulate_link_drift(self, steps=100):
+        self.run_link_dynamics(random_walk_schedule(self.base_link_costs(), steps))
+
+    def run_link_dynamics(self, schedule):
+        if not self.source_var.get():
+            messagebox.showwarning("Error", "Please select a source device")
+            return
+        
+        source_id = self.find_device_id(self.source_var.get())
+        if source_id is None:
+            messagebox.showerror("Error", "Could not find selected devices")
+            return
+        
+        self.jobs.cancel('simulation')
+        self.jobs.submit(
+            'simulation', simulate_link_dynamics, self.build_routing_graph(), schedule, [source_id],
+            on_done=self.link_dynamics_ready,
+            on_error=self.job_failed
+        )
+
+    def link_dynamics_ready(self, dynamics):
+        summary = dynamics.summary()
+        messagebox.showinfo(
+            "Link Dynamics",
+            f"Time steps: {summary['steps']}\n"
+            f"Route changes: {summary['route_changes']}\n"
+            f"Flapping routes: {summary['flapping_routes']}\n"
+            f"Mean passes to converge: {summary['mean_passes']:.2f}\n"
+            f"Worst-case passes: {summary['max_passes']}\n"
+            f"Relaxations: {summary['relaxations']}"
+        )
+
+    def run_scenario_sweep(self, batch_size=16):
+        spec_path = filedialog.askopenfilename(
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            title="Open Sweep Specification"
+        )
+        if not spec_path:
+            return
+        store_path = filedialog.askdirectory(title="Choose Result Store")
+        if not store_path:
+            return
+        
+        try:
+            with open(spec_path, 'r') as f:
+                spec = json.load(f)
+            store = ResultStore(store_path)
+            total, pending = pending_scenarios(spec, store)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load sweep: {str(e)}")
+            return
+        
+        if not pending:
+            messagebox.showinfo("Scenario Sweep", f"All {total} scenarios are already in the result store")
+            return
+        
+        # Results are flushed to the store in batches as scenarios finish, and
+        # whatever is left over is flushed when the sweep is cancelled.
+        self.cancel_sweep()
+        sweep = {
+            'store': store, 'pending': pending, 'total': total, 'batch': [],
+            'batch_size': batch_size, 'remaining': len(pending), 'failed': 0, 'rows': 0
+        }
+        self.sweep = sweep
+        for key, scenario in pending.items():
+            self.jobs.submit(
+                'sweep', run_one, key, scenario,
+                on_done=lambda result, sweep=sweep: self.sweep_result_ready(sweep, result),
+                on_error=lambda error, sweep=sweep: self.sweep_failed(sweep, error)
+            )
+
+    def sweep_result_ready(self, sweep, result):
+        key, columns = result
+        sweep['batch'].append((key, sweep['pending'][key], columns))
+        self.sweep_step(sweep)
+
+    def sweep_failed(self, sweep, error):
+        sweep['failed'] += 1
+        sweep['error'] = error
+        self.sweep_step(sweep)
+
+    def cancel_sweep(self):
+        self.jobs.cancel('sweep')
+        if self.sweep is not None:
+            self.flush_sweep(self.sweep)
+            self.sweep = None
+
+    def flush_sweep(self, sweep):
+        try:
+            sweep['rows'] += sweep['store'].append(sweep['batch'])
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to write sweep results: {str(e)}")
+        sweep['batch'] = []
+
+    def sweep_step(self, sweep):
+        sweep['remaining'] -= 1
+        if len(sweep['batch']) >= sweep['batch_size'] or not sweep['remaining']:
+            self.flush_sweep(sweep)
+        
+        if sweep['remaining']:
+            return
+        if self.sweep is sweep:
+            self.sweep = None
+        computed = len(sweep['pending']) - sweep['failed']
+        message = (
+            f"Scenarios: {sweep['total']}\n"
+            f"Already stored: {sweep['total'] - len(sweep['pending'])}\n"
+            f"Computed: {computed}\n"
+            f"Rows written: {sweep['rows']}"
+        )
+        if sweep['failed']:
+            message += f"\nFailed: {sweep['failed']} (last error: {sweep['error']})"
+        messagebox.showinfo("Scenario Sweep", message)
+
+    def import_topology(self, node_types, edges, positions=None):
+        if positions is None:
+            positions = hierarchical_layout(node_types, edges)
+        result = build_topology(node_types, edges, positions)
+        
+        self.clear_network()
+        self.devices.extend(result.devices)
+        self.connections.extend(result.connections)
+        self.connection_set.update(result.connections)
+        self.device_counters.update(result.device_counters)
+        self.layout_count = len(self.devices)
+        self.history.replace("Import topology", self.devices, self.connections, self.device_counters)
+        
+        self.fit_view()
+        self.redraw_network()
+        self.update_device_combos()
+        return result
+
+    def fit_view(self):
+        if not self.devices:
+            return
+        xs = [device[2] for device in self.devices]
+        ys = [device[3] for device in self.devices]
+        self.renderer.viewport.fit(
+            (min(xs), min(ys), max(xs), max(ys)),
+            self.canvas.winfo_width(),
+            self.canvas.winfo_height()
+        )
+
+    def auto_layout(self, mode):
+        if not self.devices:
+            return
+        
+        positions = [(device[2], device[3]) for device in self.devices]
+        if mode == 'hierarchical':
+            job = (hierarchical_layout, [device[0] for device in self.devices], self.connections)
+        elif mode == 'force':
+            job = (force_directed_layout, len(self.devices), self.connections, positions)
+        else:
+            known = [i < self.layout_count for i in range(len(self.devices))]
+            job = (incremental_layout, positions, known, self.connections)
+        
+        self.jobs.cancel('layout')
+        self.jobs.submit('layout', *job, on_done=self.layout_ready, on_error=self.job_failed)
+
+    def layout_ready(self, positions):
+        if len(positions) != len(self.devices):
+            return
+        
+        self.devices = apply_positions(self.devices, positions)
+        self.layout_count = len(self.devices)
+        self.history.replace("Auto layout", self.devices, self.connections, self.device_counters)
+        self.renderer.invalidate()
+        self.raster.reset()
+        self.clear_highlight()
+        self.fit_view()
+        self.redraw_network()
+
     def clear_network(self):
+        self.cancel_topology_jobs()
+        self.renderer.invalidate()
+        self.raster.reset()
+        self.raster.excluded.clear()
+        self.clear_highlight()
         self.canvas.delete("all")
         self.devices.clear()
         self.connections.clear()
+        self.connection_set.clear()
+        self.layout_count = 0
         self.selected_device = None
         self.connecting_device = None
         self.source_var.set('')
@@ -725,14 +1300,30 @@ class NetworkSimulator:
         if self.devices or self.connections:
             if messagebox.askyesno("Close Network", "Are you sure you want to close the current network? All unsaved changes will be lost."):
                 self.clear_network()
+                self.history.replace("Close network", [], [], self.device_counters)
                 messagebox.showinfo("Success", "Network closed successfully!")
 
     def redraw_network(self):
+        self.redraw_pending = False
         self.canvas.delete("all")
-        for i, (device_type, type_id, x, y) in enumerate(self.devices):
-            self.draw_device(i, device_type, type_id, x, y)
-        for d1, d2 in self.connections:
-            self.draw_connection(d1, d2)
+        # Running path animations stop; the overlay is redrawn in its final state.
+        self.highlight_generation += 1
+        if not self.raster_mode.get():
+            self.renderer.render(self.devices, self.connections, self.draw_device)
+        else:
+            self.raster.render(self.devices, self.connections)
+            for device_id in self.raster.excluded:
+                device_type, type_id, x, y = self.devices[device_id]
+                self.draw_device(device_id, device_type, type_id, x, y)
+                self.update_connections_for_device(device_id)
+        
+        self.draw_highlight()
+        self.show_job_progress(*self.job_progress)
+
+    def toggle_raster_mode(self):
+        self.raster.reset()
+        self.raster.excluded.clear()
+        self.redraw_network()
 
     def load_device_icons(self):
         icon_size = (32, 32)
@@ -753,38 +1344,49 @@ class NetworkSimulator:
             return None
 
     def remove_device(self, device_id):
+        self.topology_changed()
+        self.raster.reset()
         self.canvas.delete(f"device_{device_id}")
         
-        connections_to_remove = []
+        connections_to_remove = set()
         for d1, d2 in self.connections:
             if d1 == device_id or d2 == device_id:
                 conn_id = f"connection_{min(d1, d2)}_{max(d1, d2)}"
                 self.canvas.delete(conn_id)
-                connections_to_remove.append((d1, d2))
+                connections_to_remove.add((d1, d2))
         
-        for conn in connections_to_remove:
-            self.connections.remove(conn)
+        self.connections = [conn for conn in self.connections if conn not in connections_to_remove]
+        self.connection_set -= connections_to_remove
+        self.history.remove_device(device_id, connections_to_remove)
+        if device_id < self.layout_count:
+            self.layout_count -= 1
         
         self.devices.pop(device_id)
         
-        self.canvas.delete("highlight")
+        self.clear_highlight()
         self.update_device_combos()
         self.redraw_network()
 
     def remove_connection_at_position(self, x, y):
+        tolerance = 10 / self.renderer.viewport.scale
         for d1, d2 in self.connections[:]:
             dev1 = self.devices[d1]
             dev2 = self.devices[d2]
             
-            if self.is_point_near_line(x, y, dev1[2], dev1[3], dev2[2], dev2[3]):
+            if self.is_point_near_line(x, y, dev1[2], dev1[3], dev2[2], dev2[3], tolerance):
                 conn_id = f"connection_{min(d1, d2)}_{max(d1, d2)}"
                 self.canvas.delete(conn_id)
                 self.connections.remove((d1, d2))
-                self.canvas.delete("highlight")
+                self.connection_set.discard((d1, d2))
+                self.history.remove_connection((d1, d2))
+                self.topology_changed()
+                if self.raster_mode.get():
+                    self.raster.invalidate_link(self.devices, d1, d2)
+                    self.schedule_redraw()
                 return True
         return False
 
-    def is_point_near_line(self, px, py, x1, y1, x2, y2):
+    def is_point_near_line(self, px, py, x1, y1, x2, y2, tolerance=10):
         numerator = abs((y2-y1)*px - (x2-x1)*py + x2*y1 - y2*x1)
         denominator = ((y2-y1)**2 + (x2-x1)**2)**0.5
         
@@ -793,8 +1395,9 @@ class NetworkSimulator:
         
         distance = numerator/denominator
         
-        if min(x1, x2) <= px <= max(x1, x2) and min(y1, y2) <= py <= max(y1, y2):
-            return distance < 10
+        if min(x1, x2) - tolerance <= px <= max(x1, x2) + tolerance and \
+           min(y1, y2) - tolerance <= py <= max(y1, y2) + tolerance:
+            return distance < tolerance
         return False
 
     def show_connection_rules(self):
@@ -836,7 +1439,8 @@ class NetworkSimulator:
             messagebox.showwarning("Invalid Connection", "Cannot connect a device to itself!")
             return False
         
-        if (device1_id, device2_id) in self.connections or (device2_id, device1_id) in self.connections:
+        connection = (min(device1_id, device2_id), max(device1_id, device2_id))
+        if connection in self.connection_set:
             messagebox.showwarning("Invalid Connection", "These devices are already connected!")
             return False
 
@@ -847,8 +1451,11 @@ class NetworkSimulator:
             messagebox.showwarning("Invalid Connection", "Cannot connect two PCs directly!\nUse a Switch or Router between PCs.")
             return False
         
-        connection = (min(device1_id, device2_id), max(device1_id, device2_id))
         self.connections.append(connection)
+        self.connection_set.add(connection)
+        self.history.add_connection(connection)
+        self.topology_changed()
+        self.raster.invalidate_link(self.devices, device1_id, device2_id)
 
         cost = self.calculate_edge_cost(device1_id, device2_id)
         messagebox.showinfo("Connection Added", f"Connection established with cost: {cost}")
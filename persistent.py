@@ -0,0 +1,268 @@
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+HASH_BITS = 64
+
+
+class PersistentVector:
+    # 32-way trie; updates copy only the path from the root to one leaf.
+    __slots__ = ('root', 'shift', 'count')
+
+    def __init__(self, root=(), shift=0, count=0):
+        self.root = root
+        self.shift = shift
+        self.count = count
+
+    @classmethod
+    def from_iterable(cls, items):
+        level = [tuple(chunk) for chunk in chunked(items)]
+        count = sum(len(leaf) for leaf in level)
+        shift = 0
+        while len(level) > 1:
+            level = [tuple(chunk) for chunk in chunked(level)]
+            shift += BITS
+        return cls(level[0] if level else (), shift, count)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("vector index out of range")
+        node = self.root
+        for level in range(self.shift, 0, -BITS):
+            node = node[(index >> level) & MASK]
+        return node[index & MASK]
+
+    def __iter__(self):
+        return iterate_node(self.root, self.shift)
+
+    def set(self, index, value):
+        if not 0 <= index < self.count:
+            raise IndexError("vector index out of range")
+        return PersistentVector(assoc(self.root, self.shift, index, value), self.shift, self.count)
+
+    def append(self, value):
+        index = self.count
+        if index == WIDTH << self.shift:
+            root = (self.root, new_path(self.shift, value))
+            return PersistentVector(root, self.shift + BITS, index + 1)
+        return PersistentVector(push(self.root, self.shift, index, value), self.shift, index + 1)
+
+    def remove(self, index):
+        # Removing from the middle shifts every later index, so the trie is rebuilt.
+        if not 0 <= index < self.count:
+            raise IndexError("vector index out of range")
+        return PersistentVector.from_iterable(item for i, item in enumerate(self) if i != index)
+
+    def changed_indices(self, other):
+        # Subtrees shared between versions are skipped by identity.
+        common = min(self.count, other.count)
+        changed = []
+        if self.shift == other.shift:
+            diff_nodes(self.root, other.root, self.shift, 0, common, changed)
+        else:
+            changed = [i for i, (a, b) in enumerate(zip(self, other)) if a != b]
+        return changed
+
+
+def chunked(items):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == WIDTH:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iterate_node(node, shift):
+    if shift == 0:
+        yield from node
+    else:
+        for child in node:
+            yield from iterate_node(child, shift - BITS)
+
+
+def assoc(node, shift, index, value):
+    slot = (index >> shift) & MASK
+    if shift == 0:
+        return node[:slot] + (value,) + node[slot + 1:]
+    return node[:slot] + (assoc(node[slot], shift - BITS, index, value),) + node[slot + 1:]
+
+
+def new_path(shift, value):
+    node = (value,)
+    for _ in range(0, shift, BITS):
+        node = (node,)
+    return node
+
+
+def push(node, shift, index, value):
+    slot = (index >> shift) & MASK
+    if shift == 0:
+        return node + (value,)
+    if slot < len(node):
+        return node[:slot] + (push(node[slot], shift - BITS, index, value),)
+    return node + (new_path(shift - BITS, value),)
+
+
+def diff_nodes(a, b, shift, base, limit, changed):
+    if a is b or base >= limit:
+        return
+    if shift == 0:
+        for offset, (x, y) in enumerate(zip(a, b)):
+            if base + offset < limit and x != y:
+                changed.append(base + offset)
+        return
+    span = 1 << shift
+    for slot, (x, y) in enumerate(zip(a, b)):
+        diff_nodes(x, y, shift - BITS, base + slot * span, limit, changed)
+
+
+class PersistentSet:
+    # Hash array mapped trie. Slots hold None, a (hash, items) bucket, or a child node.
+    __slots__ = ('root', 'count')
+
+    def __init__(self, root=None, count=0):
+        self.root = root if root is not None else (None,) * WIDTH
+        self.count = count
+
+    @classmethod
+    def from_iterable(cls, items):
+        unique = set(items)
+        entries = [(hash(item) & ((1 << HASH_BITS) - 1), item) for item in unique]
+        return cls(hamt_build(entries, 0), len(unique))
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, item):
+        h = hash(item) & ((1 << HASH_BITS) - 1)
+        node = self.root
+        shift = 0
+        while True:
+            entry = node[(h >> shift) & MASK]
+            if entry is None:
+                return False
+            if isinstance(entry, Bucket):
+                return entry.hash == h and item in entry.items
+            node = entry
+            shift += BITS
+
+    def __iter__(self):
+        return iterate_hamt(self.root)
+
+    def add(self, item):
+        h = hash(item) & ((1 << HASH_BITS) - 1)
+        root, added = hamt_add(self.root, 0, h, item)
+        return self if not added else PersistentSet(root, self.count + 1)
+
+    def discard(self, item):
+        h = hash(item) & ((1 << HASH_BITS) - 1)
+        root, removed = hamt_remove(self.root, 0, h, item)
+        return self if not removed else PersistentSet(root, self.count - 1)
+
+    def diff(self, other):
+        # Returns (only in self, only in other); shared subtrees are skipped.
+        return hamt_diff(self.root, other.root)
+
+
+class Bucket:
+    __slots__ = ('hash', 'items')
+
+    def __init__(self, h, items):
+        self.hash = h
+        self.items = items
+
+
+def hamt_build(entries, shift):
+    slots = [[] for _ in range(WIDTH)]
+    for entry in entries:
+        slots[(entry[0] >> shift) & MASK].append(entry)
+
+    node = []
+    for group in slots:
+        if not group:
+            node.append(None)
+        elif all(h == group[0][0] for h, _ in group):
+            node.append(Bucket(group[0][0], tuple(item for _, item in group)))
+        else:
+            node.append(hamt_build(group, shift + BITS))
+    return tuple(node)
+
+
+def hamt_add(node, shift, h, item):
+    slot = (h >> shift) & MASK
+    entry = node[slot]
+    if entry is None:
+        replacement = Bucket(h, (item,))
+    elif isinstance(entry, Bucket):
+        if entry.hash == h:
+            if item in entry.items:
+                return node, False
+            replacement = Bucket(h, entry.items + (item,))
+        else:
+            child_slot = (entry.hash >> (shift + BITS)) & MASK
+            child = (None,) * child_slot + (entry,) + (None,) * (WIDTH - child_slot - 1)
+            replacement, _ = hamt_add(child, shift + BITS, h, item)
+    else:
+        replacement, added = hamt_add(entry, shift + BITS, h, item)
+        if not added:
+            return node, False
+    return node[:slot] + (replacement,) + node[slot + 1:], True
+
+
+def hamt_remove(node, shift, h, item):
+    slot = (h >> shift) & MASK
+    entry = node[slot]
+    if entry is None:
+        return node, False
+    if isinstance(entry, Bucket):
+        if entry.hash != h or item not in entry.items:
+            return node, False
+        items = tuple(x for x in entry.items if x != item)
+        replacement = Bucket(h, items) if items else None
+    else:
+        replacement, removed = hamt_remove(entry, shift + BITS, h, item)
+        if not removed:
+            return node, False
+        if all(x is None for x in replacement):
+            replacement = None
+    return node[:slot] + (replacement,) + node[slot + 1:], True
+
+
+def iterate_hamt(node):
+    for entry in node:
+        if entry is None:
+            continue
+        if isinstance(entry, Bucket):
+            yield from entry.items
+        else:
+            yield from iterate_hamt(entry)
+
+
+def hamt_diff(a, b):
+    if a is b:
+        return [], []
+    if a is None or b is None or isinstance(a, Bucket) or isinstance(b, Bucket):
+        left = set(entry_items(a))
+        right = set(entry_items(b))
+        return list(left - right), list(right - left)
+    only_a, only_b = [], []
+    for x, y in zip(a, b):
+        left, right = hamt_diff(x, y)
+        only_a.extend(left)
+        only_b.extend(right)
+    return only_a, only_b
+
+
+def entry_items(entry):
+    if entry is None:
+        return ()
+    if isinstance(entry, Bucket):
+        return entry.items
+    return iterate_hamt(entry)
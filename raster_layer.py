@@ -0,0 +1,166 @@
+from collections import defaultdict
+
+from PIL import Image, ImageDraw, ImageTk
+
+from lod_renderer import LABEL_SCALE
+from network_devices import DEVICE_COLORS
+
+TILE_SIZE = 256
+LABEL_MARGIN = 24          # room below a device for its label
+
+
+class RasterLayer:
+    def __init__(self, canvas, renderer):
+        self.canvas = canvas
+        self.renderer = renderer
+        self.image = None
+        self.photo = None
+        self.key = None
+        self.tile_links = defaultdict(set)
+        self.dirty_tiles = set()
+        self.excluded = set()
+
+    def reset(self):
+        self.image = None
+        self.key = None
+        self.tile_links = defaultdict(set)
+        self.dirty_tiles.clear()
+
+    def viewport_key(self):
+        viewport = self.renderer.viewport
+        return (viewport.scale, viewport.offset_x, viewport.offset_y,
+                self.canvas.winfo_width(), self.canvas.winfo_height())
+
+    def device_radius(self):
+        return max(2, min(15 * self.renderer.viewport.scale, 15))
+
+    def render(self, devices, connections):
+        self.renderer.refresh(devices, connections)
+        key = self.viewport_key()
+        if self.image is None or key != self.key:
+            self.key = key
+            self.rasterize_all(devices, connections)
+        elif self.dirty_tiles:
+            self.rasterize_tiles(devices)
+
+        if self.photo is None or self.photo.width() != self.image.width or self.photo.height() != self.image.height:
+            self.photo = ImageTk.PhotoImage(self.image)
+        else:
+            self.photo.paste(self.image)
+
+        self.canvas.create_image(0, 0, image=self.photo, anchor="nw", tags=("raster", "network"))
+        self.canvas.tag_lower("raster")
+
+    def rasterize_all(self, devices, connections):
+        width, height = self.key[3], self.key[4]
+        self.image = Image.new("RGB", (max(width, 1), max(height, 1)), "white")
+        self.tile_links = defaultdict(set)
+        self.dirty_tiles.clear()
+
+        visible = self.renderer.visible_devices(devices, connections)
+        visible_set = set(visible)
+        links = set()
+        for d1 in visible:
+            for d2 in self.renderer.adjacency.get(d1, ()):
+                if d2 in visible_set and d2 < d1:
+                    continue
+                links.add((min(d1, d2), max(d1, d2)))
+
+        for link in links:
+            for tile in self.link_tiles(devices, *link):
+                self.tile_links[tile].add(link)
+
+        self.draw(ImageDraw.Draw(self.image), devices, links, visible, 0, 0)
+
+    def rasterize_tiles(self, devices):
+        width, height = self.image.size
+        radius = self.device_radius() + LABEL_MARGIN
+        to_world = self.renderer.viewport.to_world
+
+        for tx, ty in self.dirty_tiles:
+            x0, y0 = tx * TILE_SIZE, ty * TILE_SIZE
+            x1, y1 = min(x0 + TILE_SIZE, width), min(y0 + TILE_SIZE, height)
+            if x0 >= width or y0 >= height or x1 <= 0 or y1 <= 0:
+                continue
+
+            wx0, wy0 = to_world(x0 - radius, y0 - radius)
+            wx1, wy1 = to_world(x1 + radius, y1 + radius)
+            tile_devices = [
+                i for i in self.renderer.grid.query(wx0, wy0, wx1, wy1)
+                if wx0 <= devices[i][2] <= wx1 and wy0 <= devices[i][3] <= wy1
+            ]
+            links = [
+                (d1, d2) for d1, d2 in self.tile_links.get((tx, ty), ())
+                if d2 in self.renderer.adjacency.get(d1, ())
+            ]
+
+            tile = Image.new("RGB", (x1 - x0, y1 - y0), "white")
+            self.draw(ImageDraw.Draw(tile), devices, links, tile_devices, x0, y0)
+            self.image.paste(tile, (x0, y0))
+
+        self.dirty_tiles.clear()
+
+    def draw(self, draw, devices, links, device_ids, origin_x, origin_y):
+        to_screen = self.renderer.viewport.to_screen
+        scale = self.renderer.viewport.scale
+        link_width = 2 if scale >= LABEL_SCALE else 1
+
+        for d1, d2 in links:
+            if d1 in self.excluded or d2 in self.excluded:
+                continue
+            x1, y1 = to_screen(devices[d1][2], devices[d1][3])
+            x2, y2 = to_screen(devices[d2][2], devices[d2][3])
+            draw.line((x1 - origin_x, y1 - origin_y, x2 - origin_x, y2 - origin_y), fill="black", width=link_width)
+
+        radius = self.device_radius()
+        for i in device_ids:
+            if i in self.excluded:
+                continue
+            device_type, type_id, x, y = devices[i]
+            sx, sy = to_screen(x, y)
+            sx -= origin_x
+            sy -= origin_y
+            draw.ellipse((sx - radius, sy - radius, sx + radius, sy + radius),
+                         fill=DEVICE_COLORS[device_type], outline="black" if scale >= LABEL_SCALE else None)
+            if scale >= LABEL_SCALE:
+                draw.text((sx, sy + radius + 2), f"{device_type.value} {type_id}", fill="black", anchor="mt")
+
+    def tiles_in_box(self, x0, y0, x1, y1):
+        if self.image is None:
+            return []
+        width, height = self.image.size
+        tx0 = max(int(min(x0, x1) // TILE_SIZE), 0)
+        ty0 = max(int(min(y0, y1) // TILE_SIZE), 0)
+        tx1 = min(int(max(x0, x1) // TILE_SIZE), (width - 1) // TILE_SIZE)
+        ty1 = min(int(max(y0, y1) // TILE_SIZE), (height - 1) // TILE_SIZE)
+        return [(tx, ty) for tx in range(tx0, tx1 + 1) for ty in range(ty0, ty1 + 1)]
+
+    def link_tiles(self, devices, d1, d2):
+        x1, y1 = self.renderer.viewport.to_screen(devices[d1][2], devices[d1][3])
+        x2, y2 = self.renderer.viewport.to_screen(devices[d2][2], devices[d2][3])
+        return self.tiles_in_box(x1 - 2, y1 - 2, x2 + 2, y2 + 2)
+
+    def invalidate_device(self, devices, device_id):
+        x, y = self.renderer.viewport.to_screen(devices[device_id][2], devices[device_id][3])
+        radius = self.device_radius() + LABEL_MARGIN
+        self.dirty_tiles.update(self.tiles_in_box(x - radius, y - radius, x + radius, y + radius))
+
+    def invalidate_link(self, devices, device1_id, device2_id):
+        link = (min(device1_id, device2_id), max(device1_id, device2_id))
+        for tile in self.link_tiles(devices, *link):
+            self.tile_links[tile].add(link)
+            self.dirty_tiles.add(tile)
+
+    def invalidate_neighbourhood(self, devices, device_id, neighbors):
+        self.invalidate_device(devices, device_id)
+        for other in neighbors:
+            self.invalidate_link(devices, device_id, other)
+
+    def exclude(self, devices, device_id, neighbors):
+        # Excluded devices (and their links) are left to the live vector layer.
+        self.excluded.add(device_id)
+        self.invalidate_neighbourhood(devices, device_id, neighbors)
+
+    def include(self, devices, device_id, neighbors):
+        self.excluded.discard(device_id)
+        self.invalidate_neighbourhood(devices, device_id, neighbors)
@@ -0,0 +1,383 @@
+import argparse
+import copy
+import glob
+import hashlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import networkx as nx
+
+from bellman_ford import bellman_ford, predecessor_array, hop_counts, first_hop_array
+from network_devices import DeviceType, LINK_COSTS
+from topology_import import (
+    DEVICE_TYPES, TYPE_CODES, TYPES_BY_NAME, read_edge_list, generate_hierarchical, build_topology
+)
+
+# Bumped whenever run_scenario changes what it writes, so old results are not reused.
+SCHEMA_VERSION = 1
+INDEX_FILE = 'scenarios.jsonl'
+SEGMENT_DIR = 'segments'
+COLUMNS = ('source', 'target', 'cost', 'hops', 'next_hop')
+DEFAULT_QUERIES = {'sources': 'Router', 'targets': 'all'}
+# Random draws must be repeatable for a hash to identify their results.
+DEFAULT_SEED = 0
+
+
+def file_digest(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def seed_of(spec):
+    seed = spec.get('seed')
+    return DEFAULT_SEED if seed is None else seed
+
+
+def canonical_scenario(scenario):
+    # Files are identified by their contents, not their paths, so moving an
+    # edge list keeps its results and editing it invalidates them.
+    scenario = copy.deepcopy(scenario)
+    topology = scenario.get('topology', {})
+    for key in ('edge_list', 'network'):
+        if key in topology:
+            topology[key + '_sha256'] = file_digest(topology.pop(key))
+    if 'generator' in topology:
+        topology['seed'] = seed_of(topology)
+    if isinstance(scenario.get('failures'), dict):
+        scenario['failures']['seed'] = seed_of(scenario['failures'])
+    scenario.setdefault('costs', {})
+    scenario.setdefault('failures', [])
+    scenario.setdefault('queries', DEFAULT_QUERIES)
+    scenario.pop('name', None)
+    scenario['schema'] = SCHEMA_VERSION
+    return scenario
+
+
+def scenario_hash(scenario):
+    text = json.dumps(canonical_scenario(scenario), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def set_path(target, dotted, value):
+    keys = dotted.split('.')
+    for key in keys[:-1]:
+        target = target.setdefault(key, {})
+    target[keys[-1]] = value
+
+
+def expand_sweep(spec):
+    # A spec is a base scenario plus a grid of dotted overrides, e.g.
+    # {"costs.Router-Router": [1, 3, 5]}; every combination is one scenario.
+    # Explicit "scenarios" entries are added on top of the base as well.
+    base = spec.get('base', {})
+    grid = spec.get('grid', {})
+    keys = sorted(grid)
+
+    scenarios = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        scenario = copy.deepcopy(base)
+        for key, value in zip(keys, values):
+            set_path(scenario, key, copy.deepcopy(value))
+        scenarios.append(scenario)
+
+    for extra in spec.get('scenarios', []):
+        scenario = copy.deepcopy(base)
+        for key, value in extra.items():
+            set_path(scenario, key, copy.deepcopy(value))
+        scenarios.append(scenario)
+
+    if not grid and not spec.get('scenarios'):
+        scenarios = [copy.deepcopy(base)]
+    return scenarios
+
+
+def load_topology(topology):
+    if 'edge_list' in topology:
+        default_type = TYPES_BY_NAME[topology.get('default_type', 'Router').lower()]
+        return read_edge_list(topology['edge_list'], default_type)
+    if 'network' in topology:
+        with open(topology['network'], 'r') as f:
+            network_config = json.load(f)
+        node_types = [DeviceType(device['type']) for device in network_config['devices']]
+        return node_types, np.array(network_config['connections'], dtype=np.int64).reshape(-1, 2)
+    if 'generator' in topology:
+        if topology['generator'] != 'hierarchical':
+            raise ValueError(f"Unknown topology generator: {topology['generator']}")
+        return generate_hierarchical(
+            topology['routers'],
+            topology['switches_per_router'],
+            topology['pcs_per_switch'],
+            topology.get('extra_router_links', 0),
+            seed_of(topology)
+        )
+    if 'types' in topology:
+        node_types = [DeviceType(name) for name in topology['types']]
+        return node_types, np.array(topology['edges'], dtype=np.int64).reshape(-1, 2)
+    raise ValueError("Scenario topology needs one of edge_list, network, generator or types")
+
+
+def cost_matrix(costs):
+    # costs maps "Type-Type" names onto link costs and overrides LINK_COSTS.
+    matrix = np.ones((len(DEVICE_TYPES), len(DEVICE_TYPES)))
+    for pair, cost in LINK_COSTS.items():
+        a, b = (TYPE_CODES[t] for t in (tuple(pair) * 2)[:2])
+        matrix[a, b] = matrix[b, a] = cost
+
+    for name, cost in costs.items():
+        parts = name.split('-')
+        if len(parts) != 2 or any(part.lower() not in TYPES_BY_NAME for part in parts):
+            raise ValueError(f"Invalid cost model entry: {name}")
+        a, b = (TYPE_CODES[TYPES_BY_NAME[part.lower()]] for part in parts)
+        matrix[a, b] = matrix[b, a] = float(cost)
+    return matrix
+
+
+def select_failures(connections, failures):
+    # Either an explicit list of [device1, device2] links or
+    # {"random": count, "seed": seed} to fail a reproducible random sample.
+    if isinstance(failures, dict):
+        rng = np.random.default_rng(seed_of(failures))
+        count = min(int(failures['random']), len(connections))
+        picked = rng.choice(len(connections), size=count, replace=False)
+        return {connections[i] for i in picked.tolist()}
+    return {(min(d1, d2), max(d1, d2)) for d1, d2 in failures}
+
+
+def select_devices(selector, node_types):
+    if selector == 'all':
+        return list(range(len(node_types)))
+    if isinstance(selector, str):
+        device_type = TYPES_BY_NAME[selector.lower()]
+        return [i for i, t in enumerate(node_types) if t == device_type]
+    return [int(device) for device in selector]
+
+
+def query_pairs(queries, node_types):
+    # Returns {source: targets}; queries are either [source, target] pairs or
+    # {"sources": ..., "targets": ...} selectors of ids, a type name or "all".
+    pairs = {}
+    if isinstance(queries, dict):
+        targets = select_devices(queries.get('targets', 'all'), node_types)
+        for source in select_devices(queries.get('sources', 'all'), node_types):
+            pairs[source] = targets
+    else:
+        for source, target in queries:
+            pairs.setdefault(int(source), []).append(int(target))
+    return pairs
+
+
+def run_scenario(scenario):
+    node_types, edges = load_topology(scenario.get('topology', {}))
+    count = len(node_types)
+    topology = build_topology(node_types, edges, np.zeros((count, 2)))
+
+    failed = select_failures(topology.connections, scenario.get('failures', []))
+    links = np.array([c for c in topology.connections if c not in failed], dtype=np.int64).reshape(-1, 2)
+
+    codes = np.fromiter((TYPE_CODES[t] for t in node_types), dtype=np.int64, count=count)
+    weights = cost_matrix(scenario.get('costs', {}))[codes[links[:, 0]], codes[links[:, 1]]]
+
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(count))
+    graph.add_weighted_edges_from(zip(links[:, 0].tolist(), links[:, 1].tolist(), weights.tolist()))
+    graph.add_weighted_edges_from(zip(links[:, 1].tolist(), links[:, 0].tolist(), weights.tolist()))
+
+    columns = {name: [] for name in COLUMNS}
+    for source, targets in query_pairs(scenario.get('queries', DEFAULT_QUERIES), node_types).items():
+        if not 0 <= source < count:
+            raise ValueError(f"Query source {source} is not a device")
+        distances, predecessors = bellman_ford(graph, source)
+        pred = predecessor_array(predecessors, count)
+        depth = hop_counts(pred, source)
+        hops = first_hop_array(pred, source, depth)
+
+        targets = np.asarray(targets, dtype=np.int64)
+        columns['source'].append(np.full(len(targets), source, dtype=np.int32))
+        columns['target'].append(targets.astype(np.int32))
+        columns['cost'].append(np.array([distances[t] for t in targets.tolist()], dtype=np.float64))
+        columns['hops'].append(depth[targets].astype(np.int32))
+        columns['next_hop'].append(hops[targets].astype(np.int32))
+
+    return {
+        name: np.concatenate(parts) if parts else np.empty(0, dtype=np.float64 if name == 'cost' else np.int32)
+        for name, parts in columns.items()
+    }
+
+
+class ResultStore:
+    # Append-only: each flush writes a new segment of column arrays, then
+    # records its scenarios in the index. A segment missing from the index
+    # (e.g. after a crash) is ignored and its scenarios are simply rerun.
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.join(path, SEGMENT_DIR), exist_ok=True)
+        self.entries = {}
+        index_path = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from an interrupted write
+                    self.entries.setdefault(entry['hash'], entry)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def next_segment(self):
+        existing = glob.glob(os.path.join(self.path, SEGMENT_DIR, '*.npz'))
+        numbers = [int(os.path.basename(name).split('.')[0]) for name in existing]
+        return f"{max(numbers, default=-1) + 1:06d}.npz"
+
+    def append(self, results):
+        # results is a list of (hash, scenario, columns) tuples.
+        results = [result for result in results if result[0] not in self.entries]
+        if not results:
+            return 0
+
+        segment = self.next_segment()
+        offsets = np.zeros(len(results) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(columns['source']) for _, _, columns in results])
+        arrays = {name: np.concatenate([columns[name] for _, _, columns in results]) for name in COLUMNS}
+
+        segment_path = os.path.join(self.path, SEGMENT_DIR, segment)
+        temp_path = segment_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                scenarios=np.array([key for key, _, _ in results], dtype='S64'),
+                offsets=offsets,
+                **arrays
+            )
+        os.replace(temp_path, segment_path)
+
+        with open(os.path.join(self.path, INDEX_FILE), 'a') as f:
+            for i, (key, scenario, _) in enumerate(results):
+                entry = {
+                    'hash': key,
+                    'segment': segment,
+                    'offset': int(offsets[i]),
+                    'rows': int(offsets[i + 1] - offsets[i]),
+                    'scenario': scenario
+                }
+                f.write(json.dumps(entry, sort_keys=True) + '\n')
+                self.entries[key] = entry
+            f.flush()
+            os.fsync(f.fileno())
+        return int(offsets[-1])
+
+    def scenario(self, key):
+        return self.entries[key]['scenario']
+
+    def load(self, keys=None, columns=COLUMNS):
+        # Returns the requested columns plus a "scenario" column of hashes.
+        wanted = set(self.entries) if keys is None else {key for key in keys if key in self.entries}
+        segments = sorted({self.entries[key]['segment'] for key in wanted})
+
+        parts = {name: [] for name in ('scenario',) + tuple(columns)}
+        for segment in segments:
+            with np.load(os.path.join(self.path, SEGMENT_DIR, segment)) as data:
+                scenarios = data['scenarios'].astype(str)
+                offsets = data['offsets']
+                keep = np.array([key in wanted and self.entries[key]['segment'] == segment for key in scenarios])
+                rows = np.repeat(keep, np.diff(offsets))
+                parts['scenario'].append(np.repeat(scenarios, np.diff(offsets))[rows])
+                for name in columns:
+                    parts[name].append(data[name][rows])
+
+        return {
+            name: np.concatenate(values) if values else np.empty(0)
+            for name, values in parts.items()
+        }
+
+
+def run_one(key, scenario):
+    return key, run_scenario(scenario)
+
+
+def pending_scenarios(spec, store):
+    # Duplicate grid points and scenarios already in the store are dropped.
+    pending = {}
+    total = 0
+    for scenario in expand_sweep(spec):
+        total += 1
+        key = scenario_hash(scenario)
+        if key not in store and key not in pending:
+            pending[key] = scenario
+    return total, pending
+
+
+def run_sweep(spec, store_path, max_workers=None, batch_size=16, on_result=None):
+    store = ResultStore(store_path)
+    total, pending = pending_scenarios(spec, store)
+
+    rows = 0
+    batch = []
+    failures = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_one, key, scenario): key for key, scenario in pending.items()}
+        # A failing scenario is recorded and skipped; finished results are
+        # flushed even if the sweep itself is interrupted.
+        try:
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    _, columns = future.result()
+                except Exception as e:
+                    failures[key] = f"{type(e).__name__}: {e}"
+                    continue
+                batch.append((key, pending[key], columns))
+                if on_result:
+                    on_result(key, columns)
+                if len(batch) >= batch_size:
+                    rows += store.append(batch)
+                    batch = []
+        finally:
+            for future in futures:
+                future.cancel()
+            rows += store.append(batch)
+
+    return {
+        'scenarios': total,
+        'computed': len(pending) - len(failures),
+        'skipped': total - len(pending),
+        'failed': len(failures),
+        'failures': failures,
+        'rows': rows
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a routing scenario sweep into a result store")
+    parser.add_argument('spec', help="sweep specification (JSON)")
+    parser.add_argument('store', help="result store directory")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=16)
+    args = parser.parse_args()
+
+    with open(args.spec, 'r') as f:
+        spec = json.load(f)
+    summary = run_sweep(spec, args.store, args.workers, args.batch_size)
+    print(f"{summary['computed']} scenarios run, {summary['skipped']} already stored, {summary['rows']} rows written")
+    for key, error in summary['failures'].items():
+        print(f"failed {key[:12]}: {error}", file=sys.stderr)
+    if summary['failed']:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
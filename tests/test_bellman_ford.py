@@ -0,0 +1,88 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from bellman_ford import (
+    bellman_ford, get_shortest_path, predecessor_array, hop_counts,
+    ancestors, first_hop_array, batch_paths
+)
+
+
+def random_graph(count, seed):
+    # Sparse enough that some nodes are unreachable from the source.
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(count))
+    for _ in range(count * 2):
+        u, v = rng.randrange(count), rng.randrange(count)
+        if u != v:
+            graph.add_edge(u, v, weight=rng.randint(1, 10))
+    return graph
+
+
+@pytest.mark.parametrize('seed', range(30))
+def test_array_paths_match_get_shortest_path(seed):
+    count = 80
+    graph = random_graph(count, seed)
+    source = seed % count
+    distances, predecessors = bellman_ford(graph, source)
+    pred = predecessor_array(predecessors, count)
+    depth = hop_counts(pred, source)
+    hops = first_hop_array(pred, source, depth)
+    flat, offsets = batch_paths(pred, source, depth)
+
+    for node in range(count):
+        expected = get_shortest_path(predecessors, source, node)
+        path = flat[offsets[node]:offsets[node + 1]].tolist()
+        assert path == expected
+        if expected:
+            assert depth[node] == len(expected) - 1
+            assert hops[node] == (expected[1] if len(expected) > 1 else source)
+        else:
+            assert distances[node] == float('infinity')
+            assert depth[node] == -1
+            assert hops[node] == -1
+
+
+def test_ancestors_walks_the_given_number_of_steps():
+    # Chain 0 <- 1 <- 2 <- ... <- 9
+    pred = np.array([-1] + list(range(9)), dtype=np.int64)
+    nodes = np.arange(10)
+    for steps in range(12):
+        expected = np.maximum(nodes - steps, 0)
+        assert ancestors(pred, nodes, np.full(10, steps)).tolist() == expected.tolist()
+    assert ancestors(pred, [9, 5, 3], [9, 2, 0]).tolist() == [0, 3, 3]
+
+
+def test_source_and_unreachable_nodes():
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(5))
+    graph.add_edge(0, 1, weight=1)
+    graph.add_edge(1, 2, weight=1)
+    graph.add_edge(3, 4, weight=1)
+    _, predecessors = bellman_ford(graph, 0)
+    pred = predecessor_array(predecessors, 5)
+    depth = hop_counts(pred, 0)
+    flat, offsets = batch_paths(pred, 0, depth)
+
+    assert depth.tolist() == [0, 1, 2, -1, -1]
+    assert first_hop_array(pred, 0, depth).tolist() == [0, 1, 1, -1, -1]
+    assert flat[offsets[0]:offsets[1]].tolist() == [0]
+    assert flat[offsets[2]:offsets[3]].tolist() == [0, 1, 2]
+    assert offsets[3] == offsets[4] == offsets[5]
+
+
+def test_nodes_in_a_tree_not_rooted_at_the_source_are_unreachable():
+    pred = np.array([-1, 0, 1, -1, 3], dtype=np.int64)
+    depth = hop_counts(pred, 0)
+    assert depth.tolist() == [0, 1, 2, -1, -1]
+    assert first_hop_array(pred, 0, depth).tolist() == [0, 1, 1, -1, -1]
+    flat, offsets = batch_paths(pred, 0, depth)
+    assert flat.tolist() == [0, 0, 1, 0, 1, 2]
+
+
+def test_predecessor_array_infers_count():
+    pred = predecessor_array({0: None, 1: 0, 3: 1})
+    assert pred.tolist() == [-1, 0, -1, 1]
@@ -0,0 +1,118 @@
+import random
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from forwarding import (
+    BASE_ADDRESS, NO_ROUTE, ForwardingTable, aggregate, assign_prefixes, compile_forwarding_tables,
+    compile_intervals, export_forwarding_tables, first_hops, load_forwarding_tables, parse_address
+)
+
+
+def network(count, seed):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(count))
+    edges = [(i, rng.randrange(i)) for i in range(1, count - 3)]
+    edges += [(rng.randrange(count - 3), rng.randrange(count - 3)) for _ in range(count // 4)]
+    # The last three devices form an island that the rest cannot reach.
+    edges += [(count - 3, count - 2), (count - 2, count - 1)]
+    for u, v in edges:
+        if u != v:
+            weight = rng.randint(1, 5)
+            graph.add_edge(u, v, weight=weight)
+            graph.add_edge(v, u, weight=weight)
+    return graph
+
+
+def block_hosts(plan, device):
+    network_address, length = plan.prefix(device)
+    size = 1 << (32 - length)
+    return [network_address, network_address + 1, network_address + size // 2, network_address + size - 1]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_lookup_matches_first_hop_for_every_host(seed):
+    count = 150
+    graph = network(count, seed)
+    routers = [0, 5, count - 2]
+    plan, tables = compile_forwarding_tables(graph, routers)
+
+    for router in routers:
+        expected = first_hops(graph, router)
+        table = tables[router]
+        addresses = []
+        hops = []
+        for device in range(count):
+            for address in block_hosts(plan, device):
+                addresses.append(address)
+                hops.append(expected[device])
+        assert table.lookup(addresses).tolist() == hops
+        assert table.lookup_one(plan.host(router)) == router
+
+
+def test_unassigned_blocks_have_no_route():
+    count = 100
+    graph = network(count, 1)
+    plan, tables = compile_forwarding_tables(graph, [0])
+    table = tables[0]
+    block = 1 << (32 - plan.length)
+    # 100 devices get a /15 split into 128 blocks; the last 28 are unassigned.
+    unassigned = [BASE_ADDRESS + i * block + offset for i in range(count, 1 << (plan.length - 8)) for offset in (0, block - 1)]
+    assert len(unassigned) > 0
+    assert set(table.lookup(unassigned).tolist()) == {NO_ROUTE}
+    outside = [parse_address('9.255.255.255'), parse_address('11.0.0.0'), parse_address('192.168.1.1')]
+    assert set(table.lookup(outside).tolist()) == {NO_ROUTE}
+
+
+def test_aggregate_merges_only_sibling_prefixes_with_one_next_hop():
+    base = parse_address('10.0.0.0')
+    networks = [base, base + 256, base + 512, base + 768, base + 1024]
+    lengths = [24] * 5
+    next_hops = [1, 1, 2, 3, 1]
+    merged = sorted(zip(*(a.tolist() for a in aggregate(networks, lengths, next_hops))))
+    # .0/24 and .1/24 merge; .2 and .3 differ; .4 has no sibling.
+    assert merged == [(base, 23, 1), (base + 512, 24, 2), (base + 768, 24, 3), (base + 1024, 24, 1)]
+
+    networks = [base + i * 256 for i in range(4)]
+    merged = list(zip(*(a.tolist() for a in aggregate(networks, [24] * 4, [7] * 4))))
+    assert merged == [(base, 22, 7)]
+
+
+def test_compile_intervals_prefers_the_longest_prefix():
+    networks = np.array([parse_address('10.0.0.0'), parse_address('10.1.0.0'), parse_address('10.1.2.0')])
+    table = ForwardingTable(0, networks, np.array([8, 16, 24]), np.array([1, 2, 3]))
+    cases = {
+        '10.0.0.1': 1, '10.1.0.1': 2, '10.1.2.200': 3, '10.1.3.0': 2,
+        '10.2.0.0': 1, '10.255.255.255': 1, '11.0.0.0': NO_ROUTE, '9.0.0.0': NO_ROUTE
+    }
+    for address, hop in cases.items():
+        assert table.lookup_one(parse_address(address)) == hop
+
+    starts, hops = compile_intervals(networks, np.array([8, 16, 24]), np.array([1, 2, 3]))
+    assert np.all(np.diff(starts) > 0)
+    assert np.all(hops[1:] != hops[:-1])
+
+
+def test_export_load_round_trip(tmp_path):
+    count = 120
+    graph = network(count, 2)
+    routers = [0, 3, 9]
+    plan, tables = compile_forwarding_tables(graph, routers)
+    path = str(tmp_path / 'tables.npz')
+    export_forwarding_tables(path, plan, tables)
+    loaded_plan, loaded = load_forwarding_tables(path)
+
+    assert loaded_plan.length == plan.length
+    assert loaded_plan.networks.tolist() == plan.networks.tolist()
+    assert sorted(loaded) == routers
+
+    rng = np.random.default_rng(0)
+    addresses = np.concatenate([
+        BASE_ADDRESS + rng.integers(0, 1 << 24, size=2000),
+        [plan.host(device) for device in range(count)]
+    ])
+    for router in routers:
+        assert loaded[router].routes() == tables[router].routes()
+        assert loaded[router].lookup(addresses).tolist() == tables[router].lookup(addresses).tolist()
@@ -0,0 +1,42 @@
+import math
+
+import numpy as np
+import pytest
+
+from layout_engine import force_directed_layout, repulsion_field
+
+
+def nearest_distances(positions):
+    delta = positions[:, None, :] - positions[None, :, :]
+    distance = np.hypot(delta[..., 0], delta[..., 1])
+    np.fill_diagonal(distance, np.inf)
+    return distance.min(axis=1)
+
+
+@pytest.mark.parametrize('count', [200, 2000])
+def test_tree_leaves_do_not_collapse_onto_parents(count):
+    # 4-ary tree: every internal node is a hub with leaves, like switches with PCs.
+    edges = [(i, (i - 1) // 4) for i in range(1, count)]
+    positions = force_directed_layout(count, edges, seed=0)
+    k = math.sqrt(count * 60.0 ** 2 / count)
+    assert nearest_distances(positions).min() > 0.05 * k
+
+
+def test_coincident_nodes_are_pushed_apart():
+    positions = np.zeros((4, 2))
+    field = repulsion_field(positions, 10.0, 32)
+    assert np.all(np.hypot(field[:, 0], field[:, 1]) > 0)
+
+
+def test_repulsion_field_matches_exact_sum():
+    rng = np.random.default_rng(1)
+    positions = rng.uniform(0, 1000, size=(400, 2))
+    k = 30.0
+    delta = positions[:, None, :] - positions[None, :, :]
+    distance_sq = (delta * delta).sum(axis=2)
+    np.fill_diagonal(distance_sq, np.inf)
+    exact = (delta * (k * k / distance_sq)[..., None]).sum(axis=1)
+
+    field = repulsion_field(positions, k, 32)
+    error = np.linalg.norm(field - exact, axis=1) / np.linalg.norm(exact, axis=1)
+    assert np.median(error) < 0.05
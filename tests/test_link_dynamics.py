@@ -0,0 +1,139 @@
+import random
+
+import networkx as nx
+import pytest
+
+from bellman_ford import bellman_ford
+from link_dynamics import CostSchedule, DynamicRouting, load_cost_schedule
+
+LABELS = {'Router 0': 0, 'Switch 0': 1, 'Router 1': 2}
+BASE_COSTS = {(0, 1): 2.0, (0, 2): 3.0}
+
+
+def test_schedule_rows_use_device_labels(tmp_path):
+    path = tmp_path / 'schedule.csv'
+    path.write_text("time,device1,device2,cost\n0,Router 0,Switch 0,5\n1,router1,Router 0,7\n")
+    schedule = load_cost_schedule(str(path), BASE_COSTS, LABELS)
+    assert schedule.links == [(0, 1), (0, 2)]
+    assert schedule.costs.tolist() == [[5.0, 3.0], [5.0, 7.0]]
+
+
+def test_schedule_rows_accept_indices_without_labels(tmp_path):
+    path = tmp_path / 'schedule.csv'
+    path.write_text("0,2,0,9\n")
+    schedule = load_cost_schedule(str(path), BASE_COSTS)
+    assert schedule.costs.tolist() == [[2.0, 9.0]]
+
+
+def test_unknown_label_is_reported(tmp_path):
+    path = tmp_path / 'schedule.csv'
+    path.write_text("0,Router 0,PC 4,5\n")
+    with pytest.raises(ValueError, match="PC 4"):
+        load_cost_schedule(str(path), BASE_COSTS, LABELS)
+
+
+def random_graph(count, seed):
+    rng = random.Random(seed)
+    base = nx.connected_watts_strogatz_graph(count, 4, 0.3, seed=seed)
+    graph = nx.DiGraph()
+    for u, v in base.edges():
+        weight = rng.randint(1, 20)
+        graph.add_edge(u, v, weight=weight)
+        graph.add_edge(v, u, weight=weight)
+    return graph
+
+
+def set_cost(graph, u, v, weight):
+    graph[u][v]['weight'] = weight
+    graph[v][u]['weight'] = weight
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_warm_start_matches_cold_run_after_cost_changes(seed):
+    rng = random.Random(seed)
+    graph = random_graph(60, seed)
+    previous = bellman_ford(graph, 0)
+    edges = [(u, v) for u, v in graph.edges() if u < v]
+
+    for _ in range(10):
+        for u, v in rng.sample(edges, 5):
+            factor = rng.choice([0.25, 0.5, 2, 4])
+            set_cost(graph, u, v, max(1, round(graph[u][v]['weight'] * factor)))
+        warm = bellman_ford(graph, 0, warm_start=previous)
+        cold = bellman_ford(graph, 0)
+        assert warm[0] == cold[0]
+        previous = warm
+
+
+def test_warm_start_matches_cold_run_after_tree_link_removal():
+    graph = random_graph(60, 7)
+    previous = bellman_ford(graph, 0)
+    # Remove a link of the shortest-path tree that leaves the graph connected.
+    for node, parent in previous[1].items():
+        if parent is None:
+            continue
+        weight = graph[parent][node]['weight']
+        graph.remove_edge(parent, node)
+        graph.remove_edge(node, parent)
+        if nx.is_strongly_connected(graph):
+            break
+        graph.add_edge(parent, node, weight=weight)
+        graph.add_edge(node, parent, weight=weight)
+
+    warm = bellman_ford(graph, 0, warm_start=previous)
+    cold = bellman_ford(graph, 0)
+    assert warm[0] == cold[0]
+    assert warm[1][node] != parent
+
+
+def test_warm_start_needs_fewer_relaxations():
+    graph = random_graph(200, 3)
+    previous = bellman_ford(graph, 0)
+    u, v = next((u, v) for u, v in graph.edges() if u < v)
+    set_cost(graph, u, v, graph[u][v]['weight'] + 1)
+
+    cold_stats, warm_stats = {}, {}
+    bellman_ford(graph, 0, stats=cold_stats)
+    bellman_ford(graph, 0, warm_start=previous, stats=warm_stats)
+    assert warm_stats['relaxations'] < cold_stats['relaxations']
+    assert warm_stats['passes'] <= cold_stats['passes']
+
+
+def triangle():
+    graph = nx.DiGraph()
+    for u, v in [(0, 1), (1, 2), (0, 2)]:
+        graph.add_edge(u, v, weight=1)
+        graph.add_edge(v, u, weight=1)
+    return graph
+
+
+def test_route_changes_and_flaps_on_scripted_schedule():
+    # Node 2 is reached via 1 until the direct 0-2 link gets cheap, then back.
+    schedule = CostSchedule(
+        [0, 1, 2, 3],
+        [(0, 1), (1, 2), (0, 2)],
+        [[1, 1, 3], [1, 1, 1.5], [1, 1, 3], [1, 1, 3]]
+    )
+    dynamics = DynamicRouting(triangle(), schedule, [0]).run()
+
+    assert [result.changed_links for result in dynamics.results] == [3, 1, 1, 0]
+    assert [result.route_changes for result in dynamics.results] == [0, 1, 1, 0]
+    assert dynamics.routes[0][1][2] == 1
+    assert dynamics.flaps == {(0, 2): 2}
+
+    summary = dynamics.summary()
+    assert summary['steps'] == 4
+    assert summary['route_changes'] == 2
+    assert summary['flapping_routes'] == 1
+
+
+def test_warm_and_cold_dynamics_agree():
+    schedule = CostSchedule(
+        [0, 1, 2, 3],
+        [(0, 1), (1, 2), (0, 2)],
+        [[1, 1, 3], [1, 1, 1.5], [4, 1, 1.5], [1, 1, 3]]
+    )
+    warm = DynamicRouting(triangle(), schedule, [0, 2], warm_start=True).run()
+    cold = DynamicRouting(triangle(), schedule, [0, 2], warm_start=False).run()
+    assert warm.routes == cold.routes
+    assert [r.route_changes for r in warm.results] == [r.route_changes for r in cold.results]
@@ -0,0 +1,130 @@
+import random
+
+from persistent import PersistentVector, PersistentSet, WIDTH
+
+
+class Collider:
+    # Equal hashes force items into one bucket; hashes sharing their low bits
+    # force the trie to grow deep before the items separate.
+    def __init__(self, name, h):
+        self.name = name
+        self.h = h
+
+    def __hash__(self):
+        return self.h
+
+    def __eq__(self, other):
+        return isinstance(other, Collider) and self.name == other.name
+
+    def __repr__(self):
+        return f"Collider({self.name!r})"
+
+
+def test_random_add_discard_matches_set():
+    rng = random.Random(0)
+    expected = set()
+    current = PersistentSet()
+    versions = [(current, set())]
+    for _ in range(5000):
+        item = rng.randrange(2000)
+        if rng.random() < 0.6:
+            current = current.add(item)
+            expected.add(item)
+        else:
+            current = current.discard(item)
+            expected.discard(item)
+        if rng.random() < 0.01:
+            versions.append((current, set(expected)))
+        assert len(current) == len(expected)
+
+    assert set(current) == expected
+    assert all(item in current for item in expected)
+    assert not any(item in current for item in range(2000, 2100))
+    # Older versions are unaffected by later updates.
+    for version, contents in versions:
+        assert set(version) == contents
+        assert len(version) == len(contents)
+
+
+def test_from_iterable_matches_incremental_adds():
+    items = random.Random(1).sample(range(10 ** 6), 3000)
+    built = PersistentSet.from_iterable(items)
+    grown = PersistentSet()
+    for item in items:
+        grown = grown.add(item)
+    assert set(built) == set(grown) == set(items)
+    assert built.diff(grown) == ([], [])
+
+
+def test_diff_reports_both_sides():
+    old = PersistentSet.from_iterable(range(500))
+    new = old.discard(3).discard(250).add(900).add(901)
+    added, removed = new.diff(old)
+    assert sorted(added) == [900, 901]
+    assert sorted(removed) == [3, 250]
+
+
+def test_full_hash_collisions_share_a_bucket():
+    a, b, c = Collider('a', 42), Collider('b', 42), Collider('c', 42)
+    s = PersistentSet().add(a).add(b).add(c).add(a)
+    assert len(s) == 3
+    assert a in s and b in s and c in s
+    assert Collider('d', 42) not in s
+
+    s = s.discard(b)
+    assert len(s) == 2
+    assert b not in s and a in s and c in s
+    assert s.discard(Collider('d', 42)) is s
+    assert set(PersistentSet.from_iterable([a, b, c])) == {a, b, c}
+
+
+def test_partial_hash_collisions_build_deep_nodes():
+    # Same low 60 bits, different top bits: the items only split at the last level.
+    low = (1 << 60) - 1
+    items = [Collider(str(i), low | (i << 60)) for i in range(4)]
+    s = PersistentSet()
+    for item in items:
+        s = s.add(item)
+    assert len(s) == 4
+    assert all(item in s for item in items)
+    assert set(PersistentSet.from_iterable(items)) == set(items)
+
+    for item in items:
+        s = s.discard(item)
+        assert item not in s
+    assert len(s) == 0
+    assert list(s) == []
+
+
+def test_vector_get_set_append():
+    items = list(range(3000))
+    v = PersistentVector.from_iterable(items)
+    assert list(v) == items
+    assert v[1234] == 1234 and v[-1] == 2999
+
+    w = v.set(1234, 'x').append('y')
+    assert v[1234] == 1234 and len(v) == 3000
+    assert w[1234] == 'x' and w[3000] == 'y' and len(w) == 3001
+
+
+def test_vector_remove_shifts_later_items():
+    v = PersistentVector.from_iterable(range(100))
+    assert list(v.remove(40)) == [i for i in range(100) if i != 40]
+
+
+def test_changed_indices_across_depth_increase():
+    for size in (WIDTH, WIDTH * WIDTH):
+        old = PersistentVector.from_iterable(range(size))
+        new = old.append('new')
+        assert new.shift > old.shift
+        new = new.set(3, 'changed').set(size - 1, 'last')
+
+        assert new.changed_indices(old) == [3, size - 1]
+        assert old.changed_indices(new) == [3, size - 1]
+
+
+def test_changed_indices_at_same_depth():
+    old = PersistentVector.from_iterable(range(5000))
+    new = old.set(7, -1).set(4096, -1)
+    assert new.changed_indices(old) == [7, 4096]
+    assert new.changed_indices(new) == []
@@ -0,0 +1,49 @@
+import copy
+
+import numpy as np
+
+from sweep_runner import COLUMNS, DEFAULT_SEED, ResultStore, run_scenario, run_sweep, scenario_hash
+
+SPEC = {
+    'base': {'topology': {'generator': 'hierarchical', 'routers': 4, 'switches_per_router': 2, 'pcs_per_switch': 2, 'seed': 1}},
+    'grid': {'costs.Router-Router': [1, 2, 3, 4, 5, 6]},
+    'scenarios': [{'topology': {'generator': 'bogus'}}]
+}
+
+
+def test_failed_scenario_does_not_discard_finished_results(tmp_path):
+    summary = run_sweep(SPEC, str(tmp_path), max_workers=2, batch_size=4)
+    assert summary['failed'] == 1
+    assert summary['computed'] == 6
+    assert len(ResultStore(str(tmp_path))) == 6
+
+
+def test_stored_scenarios_are_not_recomputed(tmp_path):
+    run_sweep(SPEC, str(tmp_path), max_workers=2)
+    summary = run_sweep(SPEC, str(tmp_path), max_workers=2)
+    assert summary['skipped'] == 6
+    assert summary['computed'] == 0
+    assert summary['rows'] == 0
+
+
+def test_seedless_random_scenarios_are_reproducible():
+    scenario = {
+        'topology': {'generator': 'hierarchical', 'routers': 8, 'switches_per_router': 2,
+                     'pcs_per_switch': 2, 'extra_router_links': 6},
+        'failures': {'random': 3}
+    }
+    first = run_scenario(scenario)
+    second = run_scenario(scenario)
+    for name in COLUMNS:
+        assert np.array_equal(first[name], second[name])
+
+    seeded = copy.deepcopy(scenario)
+    seeded['topology']['seed'] = DEFAULT_SEED
+    seeded['failures']['seed'] = DEFAULT_SEED
+    assert scenario_hash(scenario) == scenario_hash(seeded)
+    for name in COLUMNS:
+        assert np.array_equal(first[name], run_scenario(seeded)[name])
+
+    reseeded = copy.deepcopy(seeded)
+    reseeded['failures']['seed'] = DEFAULT_SEED + 1
+    assert scenario_hash(reseeded) != scenario_hash(scenario)
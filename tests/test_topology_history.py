@@ -0,0 +1,68 @@
+import topology_history
+from topology_history import TopologyHistory
+
+
+def device(i, x=0.0):
+    return ('Router', i, x, 0.0)
+
+
+def test_undo_redo_round_trip():
+    history = TopologyHistory([device(0)], [])
+    history.add_device(device(1), {'Router': 2})
+    history.add_connection((0, 1))
+    assert list(history.current.devices) == [device(0), device(1)]
+    assert list(history.current.connections) == [(0, 1)]
+
+    history.undo()
+    history.undo()
+    assert list(history.current.devices) == [device(0)]
+    assert history.undo() is None
+
+
+def test_new_commit_forgets_redo_branch_but_keeps_snapshots():
+    history = TopologyHistory([device(0)], [])
+    history.move_device(0, device(0, 10.0))
+    history.snapshot('moved')
+    moved = history.current.id
+    history.move_device(0, device(0, 20.0))
+    dropped = history.current.id
+
+    history.undo()
+    history.undo()
+    history.add_connection((0, 0))
+
+    assert dropped not in history.versions
+    assert moved in history.versions
+    assert not history.can_redo()
+    assert list(history.restore('moved').devices) == [device(0, 10.0)]
+
+
+def test_snapshot_survives_undo_limit(monkeypatch):
+    monkeypatch.setattr(topology_history, 'MAX_UNDO', 5)
+    history = TopologyHistory([device(0)], [])
+    history.snapshot('start')
+    start = history.current.id
+    for step in range(20):
+        history.move_device(0, device(0, float(step)))
+
+    assert len(history.undo_stack) == 5
+    assert start in history.versions
+    # Only the snapshot and the versions still reachable by undo are kept.
+    assert len(history.versions) == 5 + 1 + 1
+    assert list(history.restore('start').devices) == [device(0)]
+
+
+def test_diff_between_versions():
+    history = TopologyHistory([device(0), device(1)], [(0, 1)])
+    first = history.current.id
+    history.move_device(1, device(1, 5.0))
+    history.add_device(device(2), None)
+    history.remove_connection((0, 1))
+    history.add_connection((1, 2))
+
+    diff = history.diff(first, history.current.id)
+    assert diff['devices_changed'] == [1]
+    assert diff['devices_added'] == [2]
+    assert diff['devices_removed'] == []
+    assert diff['connections_added'] == [(1, 2)]
+    assert diff['connections_removed'] == [(0, 1)]
@@ -0,0 +1,41 @@
+from network_devices import DeviceType
+from topology_import import parse_device_type, read_edge_list, build_topology
+
+
+def test_parse_device_type_reads_leading_letters():
+    assert parse_device_type('PC1', DeviceType.ROUTER) == DeviceType.PC
+    assert parse_device_type('Switch12', DeviceType.ROUTER) == DeviceType.SWITCH
+    assert parse_device_type('router-7', DeviceType.PC) == DeviceType.ROUTER
+    assert parse_device_type('pc_3', DeviceType.ROUTER) == DeviceType.PC
+    assert parse_device_type('core1', DeviceType.SWITCH) == DeviceType.SWITCH
+    assert parse_device_type('', DeviceType.SWITCH) == DeviceType.SWITCH
+
+
+def test_pc_pc_links_from_unseparated_names_are_rejected(tmp_path):
+    path = tmp_path / 'edges.csv'
+    path.write_text("PC1,PC2\nPC1,Switch1\n")
+    node_types, edges = read_edge_list(str(path))
+    result = build_topology(node_types, edges)
+    assert node_types == [DeviceType.PC, DeviceType.PC, DeviceType.SWITCH]
+    assert result.rejected['pc_pc'] == 1
+    assert result.connections == [(0, 2)]
+
+
+def test_weight_columns_are_not_read_as_types(tmp_path):
+    path = tmp_path / 'weighted.txt'
+    path.write_text("PC1 PC2 1\nPC1 Switch1 2.5\n")
+    node_types, edges = read_edge_list(str(path))
+    assert node_types == [DeviceType.PC, DeviceType.PC, DeviceType.SWITCH]
+    assert build_topology(node_types, edges).rejected['pc_pc'] == 1
+
+    path = tmp_path / 'weighted.csv'
+    path.write_text("source,target,weight\nPC1,PC2,1\nRouter1,PC1,3\n")
+    node_types, _ = read_edge_list(str(path))
+    assert node_types == [DeviceType.PC, DeviceType.PC, DeviceType.ROUTER]
+
+
+def test_type_columns_override_names(tmp_path):
+    path = tmp_path / 'typed.csv'
+    path.write_text("core,edge,Router,Switch\n")
+    node_types, _ = read_edge_list(str(path), DeviceType.PC)
+    assert node_types == [DeviceType.ROUTER, DeviceType.SWITCH]
@@ -0,0 +1,50 @@
+import networkx as nx
+import pytest
+
+from bellman_ford import routing_tables
+from traffic_simulator import Flow, TrafficSimulation, simulate
+
+
+def test_undirected_graph_routes_both_ways():
+    graph = nx.Graph()
+    graph.add_weighted_edges_from([(0, 1, 1), (1, 2, 1)])
+    report = simulate(graph, [Flow(2, 0, 100), Flow(0, 2, 100)], 1.0)
+    summary = report.summary()
+    assert summary['sent'] == 200
+    assert summary['delivered'] == 200
+    assert summary['no_route'] == 0
+
+
+@pytest.mark.parametrize('rate', [0, -5])
+def test_flow_rejects_non_positive_rate(rate):
+    with pytest.raises(ValueError):
+        Flow(0, 1, rate)
+
+
+def test_one_way_links_are_routed_forwards():
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([(0, 1, 1), (1, 2, 1)])
+    summary = simulate(graph, [Flow(0, 2, 50)], 1.0).summary()
+    assert summary['delivered'] == summary['sent'] == 50
+    assert summary['no_route'] == 0
+
+
+def test_asymmetric_weights_use_the_forward_cost():
+    graph = nx.DiGraph()
+    graph.add_weighted_edges_from([(0, 1, 1), (1, 2, 1), (0, 2, 5), (2, 0, 1), (2, 1, 10), (1, 0, 10)])
+    tables = routing_tables(graph, [2])
+    assert tables[2][0] == 1
+    assert tables[2][1] == 2
+
+    simulation = TrafficSimulation(graph, [Flow(0, 2, 10)])
+    simulation.run(1.0)
+    assert simulation.links[(0, 1)].sent == 10
+    assert simulation.links[(0, 2)].sent == 0
+
+
+def test_constant_rate_flow_sends_exact_packet_count():
+    graph = nx.Graph()
+    graph.add_weighted_edges_from([(0, 1, 1), (1, 2, 1)])
+    flow = Flow(0, 2, 10, stop=1.0)
+    simulate(graph, [flow], 2.0)
+    assert flow.sent == 10
@@ -0,0 +1,126 @@
+from itertools import count
+
+from persistent import PersistentVector, PersistentSet
+
+MAX_UNDO = 500
+
+
+class Version:
+    __slots__ = ('id', 'devices', 'connections', 'counters', 'description')
+
+    def __init__(self, version_id, devices, connections, counters, description):
+        self.id = version_id
+        self.devices = devices
+        self.connections = connections
+        self.counters = counters
+        self.description = description
+
+
+class TopologyHistory:
+    def __init__(self, devices=(), connections=(), counters=None):
+        self.ids = count()
+        self.versions = {}
+        self.snapshots = {}
+        self.undo_stack = []
+        self.redo_stack = []
+        self.current = self.new_version(
+            PersistentVector.from_iterable(devices),
+            PersistentSet.from_iterable(connections),
+            counters,
+            "Initial"
+        )
+
+    def new_version(self, devices, connections, counters, description):
+        if counters is not None and not isinstance(counters, tuple):
+            counters = tuple(counters.items())
+        version = Version(next(self.ids), devices, connections, counters, description)
+        self.versions[version.id] = version
+        return version
+
+    def commit(self, description, devices=None, connections=None, counters=None):
+        current = self.current
+        version = self.new_version(
+            current.devices if devices is None else devices,
+            current.connections if connections is None else connections,
+            current.counters if counters is None else counters,
+            description
+        )
+        self.undo_stack.append(current)
+        for dropped in self.redo_stack:
+            self.forget(dropped)
+        self.redo_stack.clear()
+        if len(self.undo_stack) > MAX_UNDO:
+            self.forget(self.undo_stack.pop(0))
+        self.current = version
+        return version
+
+    def forget(self, version):
+        if version.id not in self.snapshots.values():
+            self.versions.pop(version.id, None)
+
+    def add_device(self, device, counters):
+        return self.commit("Add device", devices=self.current.devices.append(device), counters=counters)
+
+    def move_device(self, index, device):
+        return self.commit("Move device", devices=self.current.devices.set(index, device))
+
+    def remove_device(self, index, removed_connections):
+        connections = self.current.connections
+        for connection in removed_connections:
+            connections = connections.discard(connection)
+        return self.commit("Remove device", devices=self.current.devices.remove(index), connections=connections)
+
+    def add_connection(self, connection):
+        return self.commit("Add connection", connections=self.current.connections.add(connection))
+
+    def remove_connection(self, connection):
+        return self.commit("Remove connection", connections=self.current.connections.discard(connection))
+
+    def replace(self, description, devices, connections, counters):
+        return self.commit(
+            description,
+            devices=PersistentVector.from_iterable(devices),
+            connections=PersistentSet.from_iterable(connections),
+            counters=counters
+        )
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo(self):
+        if not self.undo_stack:
+            return None
+        self.redo_stack.append(self.current)
+        self.current = self.undo_stack.pop()
+        return self.current
+
+    def redo(self):
+        if not self.redo_stack:
+            return None
+        self.undo_stack.append(self.current)
+        self.current = self.redo_stack.pop()
+        return self.current
+
+    def snapshot(self, name):
+        self.snapshots[name] = self.current.id
+        return self.current
+
+    def restore(self, name):
+        version = self.versions[self.snapshots[name]]
+        return self.commit(f"Restore {name}", version.devices, version.connections, version.counters)
+
+    def diff(self, old_id, new_id):
+        old = self.versions[old_id]
+        new = self.versions[new_id]
+        common = min(len(old.devices), len(new.devices))
+        added_connections, removed_connections = new.connections.diff(old.connections)
+        return {
+            'devices_changed': new.devices.changed_indices(old.devices),
+            'devices_added': list(range(common, len(new.devices))),
+            'devices_removed': list(range(common, len(old.devices))),
+            'connections_added': added_connections,
+            'connections_removed': removed_connections
+        }
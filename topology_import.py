@@ -0,0 +1,151 @@
+import csv
+import math
+import re
+
+import numpy as np
+
+from network_devices import DeviceType
+
+DEVICE_TYPES = list(DeviceType)
+TYPE_CODES = {device_type: code for code, device_type in enumerate(DEVICE_TYPES)}
+PC_CODE = TYPE_CODES[DeviceType.PC]
+TYPES_BY_NAME = {device_type.value.lower(): device_type for device_type in DeviceType}
+
+
+class ImportResult:
+    def __init__(self, devices, connections, device_counters, rejected):
+        self.devices = devices
+        self.connections = connections
+        self.device_counters = device_counters
+        self.rejected = rejected
+
+
+def parse_device_type(name, default_type):
+    # The leading letters name the type: "PC1", "Switch_12" and "router-7" all match.
+    prefix = re.match(r'[A-Za-z]*', name.strip()).group().lower()
+    return TYPES_BY_NAME.get(prefix, default_type)
+
+
+def read_edge_list(file_path, default_type=DeviceType.ROUTER):
+    # Accepts "a,b" / "a b" rows, an optional "source,target" header and
+    # optional third/fourth columns giving the device types of both ends.
+    # Extra columns that do not name a type (e.g. weights) are ignored.
+    node_index = {}
+    node_types = []
+    edges = []
+
+    def index_of(name, type_name):
+        index = node_index.get(name)
+        if index is None:
+            index = len(node_types)
+            node_index[name] = index
+            if type_name and type_name.lower() in TYPES_BY_NAME:
+                node_types.append(TYPES_BY_NAME[type_name.lower()])
+            else:
+                node_types.append(parse_device_type(name, default_type))
+        return index
+
+    with open(file_path, newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        delimiter = ',' if ',' in sample else None
+
+        rows = csv.reader(f) if delimiter else (line.split() for line in f)
+        for row in rows:
+            row = [value.strip() for value in row]
+            if not row or not row[0] or row[0].startswith('#'):
+                continue
+            if row[0].lower() == 'source' and len(row) > 1 and row[1].lower() == 'target':
+                continue
+            if len(row) < 2:
+                raise ValueError(f"Edge list row has fewer than two columns: {row}")
+
+            source_type = row[2] if len(row) > 2 else None
+            target_type = row[3] if len(row) > 3 else None
+            edges.append((index_of(row[0], source_type), index_of(row[1], target_type)))
+
+    return node_types, np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+
+def from_networkx(graph, type_attribute='type', default_type=DeviceType.ROUTER):
+    nodes = list(graph.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    node_types = []
+    for node in nodes:
+        value = graph.nodes[node].get(type_attribute)
+        if isinstance(value, DeviceType):
+            node_types.append(value)
+        elif value is not None:
+            node_types.append(TYPES_BY_NAME.get(str(value).lower(), default_type))
+        else:
+            node_types.append(default_type)
+
+    edges = np.array([(index[u], index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+    return node_types, edges
+
+
+def generate_hierarchical(routers, switches_per_router, pcs_per_switch, extra_router_links=0, seed=None):
+    rng = np.random.default_rng(seed)
+    switches = routers * switches_per_router
+    pcs = switches * pcs_per_switch
+
+    node_types = [DeviceType.ROUTER] * routers + [DeviceType.SWITCH] * switches + [DeviceType.PC] * pcs
+
+    router_ids = np.arange(routers)
+    switch_ids = routers + np.arange(switches)
+    pc_ids = routers + switches + np.arange(pcs)
+
+    # Random spanning tree over the routers keeps the core connected.
+    core = np.column_stack([router_ids[1:], rng.integers(0, np.maximum(router_ids[1:], 1))])
+    extra = rng.integers(0, routers, size=(extra_router_links, 2)) if routers > 1 else np.empty((0, 2), dtype=np.int64)
+    access = np.column_stack([switch_ids, np.repeat(router_ids, switches_per_router)])
+    edge = np.column_stack([pc_ids, np.repeat(switch_ids, pcs_per_switch)])
+
+    edges = np.concatenate([core, extra, access, edge]).astype(np.int64)
+    return node_types, edges
+
+
+def grid_positions(count, spacing=80):
+    columns = max(int(math.ceil(math.sqrt(count))), 1)
+    index = np.arange(count)
+    return np.column_stack([
+        (index % columns) * spacing + spacing,
+        (index // columns) * spacing + spacing
+    ]).astype(float)
+
+
+def build_topology(node_types, edges, positions=None):
+    count = len(node_types)
+    codes = np.fromiter((TYPE_CODES[t] for t in node_types), dtype=np.int8, count=count)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+
+    lo = np.minimum(edges[:, 0], edges[:, 1])
+    hi = np.maximum(edges[:, 0], edges[:, 1])
+
+    self_loop = lo == hi
+    pc_pc = (codes[lo] == PC_CODE) & (codes[hi] == PC_CODE) & ~self_loop
+    valid = ~(self_loop | pc_pc)
+    lo, hi = lo[valid], hi[valid]
+
+    keys = lo * count + hi
+    unique_keys = np.unique(keys)
+    duplicates = len(keys) - len(unique_keys)
+
+    connections = list(zip((unique_keys // count).tolist(), (unique_keys % count).tolist()))
+
+    if positions is None:
+        positions = grid_positions(count)
+    positions = np.asarray(positions, dtype=float)
+
+    device_counters = {device_type: 0 for device_type in DeviceType}
+    devices = []
+    for i, device_type in enumerate(node_types):
+        devices.append((device_type, device_counters[device_type], float(positions[i, 0]), float(positions[i, 1])))
+        device_counters[device_type] += 1
+
+    rejected = {
+        'self_loops': int(self_loop.sum()),
+        'pc_pc': int(pc_pc.sum()),
+        'duplicates': duplicates
+    }
+    return ImportResult(devices, connections, device_counters, rejected)
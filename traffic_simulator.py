@@ -0,0 +1,255 @@
+import heapq
+import random
+from collections import deque
+
+import numpy as np
+
+from bellman_ford import routing_tables
+
+ARRIVE = 0
+TRANSMIT_DONE = 1
+GENERATE = 2
+
+DEFAULT_BANDWIDTH = 100e6      # bits per second
+DEFAULT_QUEUE_LIMIT = 64       # packets waiting per link
+DELAY_PER_COST = 0.001         # seconds of propagation delay per unit of edge cost
+
+
+class Event:
+    __slots__ = ('kind', 'target', 'packet')
+
+
+class Packet:
+    __slots__ = ('flow', 'destination', 'size', 'created')
+
+
+class EventQueue:
+    def __init__(self):
+        self.heap = []
+        self.pool = []
+        self.sequence = 0
+        self.now = 0.0
+
+    def schedule(self, time, kind, target, packet=None):
+        event = self.pool.pop() if self.pool else Event()
+        event.kind = kind
+        event.target = target
+        event.packet = packet
+        self.sequence += 1
+        heapq.heappush(self.heap, (time, self.sequence, event))
+
+    def pop(self):
+        time, _, event = heapq.heappop(self.heap)
+        self.now = time
+        return event
+
+    def release(self, event):
+        event.target = None
+        event.packet = None
+        self.pool.append(event)
+
+    def next_time(self):
+        return self.heap[0][0] if self.heap else None
+
+
+class Link:
+    __slots__ = ('source', 'target', 'bandwidth', 'delay', 'queue_limit',
+                 'queue', 'in_flight', 'busy_time', 'sent', 'dropped')
+
+    def __init__(self, source, target, bandwidth, delay, queue_limit):
+        self.source = source
+        self.target = target
+        self.bandwidth = bandwidth
+        self.delay = delay
+        self.queue_limit = queue_limit
+        self.queue = deque()
+        self.in_flight = None
+        self.busy_time = 0.0
+        self.sent = 0
+        self.dropped = 0
+
+
+class Flow:
+    __slots__ = ('source', 'target', 'rate', 'packet_size', 'start', 'stop',
+                 'poisson', 'sent', 'delivered', 'dropped', 'delivered_bytes')
+
+    def __init__(self, source, target, rate, packet_size=1500, start=0.0, stop=None, poisson=False):
+        if rate <= 0:
+            raise ValueError(f"Flow rate must be positive, got {rate}")
+        if packet_size <= 0:
+            raise ValueError(f"Packet size must be positive, got {packet_size}")
+        self.source = source
+        self.target = target
+        self.rate = rate
+        self.packet_size = packet_size
+        self.start = start
+        self.stop = stop
+        self.poisson = poisson
+        self.sent = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.delivered_bytes = 0
+
+
+class TrafficSimulation:
+    def __init__(self, graph, flows, bandwidth=DEFAULT_BANDWIDTH,
+                 queue_limit=DEFAULT_QUEUE_LIMIT, delay_per_cost=DELAY_PER_COST, seed=None):
+        self.flows = list(flows)
+        self.events = EventQueue()
+        self.random = random.Random(seed)
+        self.packet_pool = []
+        self.latencies = []
+        self.no_route = 0
+
+        # Undirected graphs carry traffic both ways over every edge.
+        if not graph.is_directed():
+            graph = graph.to_directed()
+
+        self.links = {}
+        for u, v, data in graph.edges(data=True):
+            self.links[(u, v)] = Link(
+                u, v,
+                data.get('capacity', bandwidth),
+                data.get('delay', data.get('weight', 1) * delay_per_cost),
+                data.get('queue_limit', queue_limit)
+            )
+
+        destinations = {flow.target for flow in self.flows}
+        self.next_hops = routing_tables(graph, destinations)
+
+        for flow in self.flows:
+            self.events.schedule(flow.start, GENERATE, flow)
+
+    def run(self, until):
+        events = self.events
+        heap = events.heap
+
+        # The window is [0, until), matching how a flow stop time is treated.
+        while heap and heap[0][0] < until:
+            event = events.pop()
+            kind = event.kind
+            if kind == ARRIVE:
+                self.arrive(event.target, event.packet)
+            elif kind == TRANSMIT_DONE:
+                self.transmit_done(event.target)
+            else:
+                self.generate(event.target)
+            events.release(event)
+
+        events.now = until
+        return self.report(until)
+
+    def generate(self, flow):
+        now = self.events.now
+        if flow.stop is not None and now >= flow.stop:
+            return
+
+        packet = self.packet_pool.pop() if self.packet_pool else Packet()
+        packet.flow = flow
+        packet.destination = flow.target
+        packet.size = flow.packet_size
+        packet.created = now
+        flow.sent += 1
+        self.arrive(flow.source, packet)
+
+        # Constant-rate send times are computed from the packet count rather
+        # than summed, so rounding cannot add an extra packet before stop.
+        if flow.poisson:
+            next_time = now + self.random.expovariate(flow.rate)
+        else:
+            next_time = flow.start + flow.sent / flow.rate
+        self.events.schedule(next_time, GENERATE, flow)
+
+    def arrive(self, node, packet):
+        if node == packet.destination:
+            flow = packet.flow
+            flow.delivered += 1
+            flow.delivered_bytes += packet.size
+            self.latencies.append(self.events.now - packet.created)
+            self.release_packet(packet)
+            return
+
+        next_hop = self.next_hops[packet.destination].get(node)
+        if next_hop is None:
+            self.no_route += 1
+            self.drop(packet)
+            return
+
+        link = self.links[(node, next_hop)]
+        if link.in_flight is None:
+            self.start_transmission(link, packet)
+        elif len(link.queue) < link.queue_limit:
+            link.queue.append(packet)
+        else:
+            link.dropped += 1
+            self.drop(packet)
+
+    def start_transmission(self, link, packet):
+        transmit_time = packet.size * 8 / link.bandwidth
+        link.in_flight = packet
+        link.busy_time += transmit_time
+        self.events.schedule(self.events.now + transmit_time, TRANSMIT_DONE, link)
+
+    def transmit_done(self, link):
+        packet = link.in_flight
+        link.sent += 1
+        self.events.schedule(self.events.now + link.delay, ARRIVE, link.target, packet)
+
+        if link.queue:
+            self.start_transmission(link, link.queue.popleft())
+        else:
+            link.in_flight = None
+
+    def drop(self, packet):
+        packet.flow.dropped += 1
+        self.release_packet(packet)
+
+    def release_packet(self, packet):
+        packet.flow = None
+        self.packet_pool.append(packet)
+
+    def report(self, duration):
+        return SimulationReport(self, duration)
+
+
+class SimulationReport:
+    def __init__(self, simulation, duration):
+        self.duration = duration
+        self.sent = sum(flow.sent for flow in simulation.flows)
+        self.delivered = sum(flow.delivered for flow in simulation.flows)
+        self.dropped = sum(flow.dropped for flow in simulation.flows)
+        self.no_route = simulation.no_route
+        self.latencies = np.asarray(simulation.latencies, dtype=float)
+        self.flow_throughput = {
+            (flow.source, flow.target): flow.delivered_bytes * 8 / duration if duration else 0.0
+            for flow in simulation.flows
+        }
+        self.link_utilization = {
+            key: min(link.busy_time / duration, 1.0) if duration else 0.0
+            for key, link in simulation.links.items()
+        }
+        self.link_drops = {
+            key: link.dropped for key, link in simulation.links.items() if link.dropped
+        }
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)):
+        if not len(self.latencies):
+            return {p: None for p in percentiles}
+        values = np.percentile(self.latencies, percentiles)
+        return dict(zip(percentiles, values.tolist()))
+
+    def summary(self):
+        mean_latency = float(self.latencies.mean()) if len(self.latencies) else None
+        return {
+            'sent': self.sent,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'no_route': self.no_route,
+            'throughput_bps': sum(self.flow_throughput.values()),
+            'mean_latency': mean_latency,
+            'latency_percentiles': self.latency_percentiles(),
+        }
+
+
+def simulate(graph, flows, duration, **kwargs):
+    return TrafficSimulation(graph, flows, **kwargs).run(duration)